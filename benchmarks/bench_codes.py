@@ -0,0 +1,68 @@
+"""
+Микробенчмарк генерации кодов.
+
+Сравнивает прежнюю генерацию через random.choice (со списком алфавита, который строится заново для каждого символа)
+с генераторами users.codes на основе secrets: стоимость одного кода и пропускную способность пакетной генерации.
+Отдельно замеряется хеширование кода активации. База данных не используется.
+
+Запуск из корня проекта:
+    python benchmarks/bench_codes.py --count 100000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from users.codes import auth_codes, hash_auth_code, referral_codes  # noqa: E402
+
+
+def legacy_referral_code():
+    return ''.join([random.choice(list(string.ascii_uppercase + string.digits)) for x in range(6)])
+
+
+def legacy_auth_code():
+    return ''.join([random.choice(list('123456789')) for x in range(4)])
+
+
+def per_call_us(func, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - started) / count * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=100_000)
+    args = parser.parse_args()
+    count = args.count
+
+    print(f'{"операция":<40}{"мкс/код":>10}{"кодов/с":>14}')
+    rows = [
+        ('промо-код, random.choice', per_call_us(legacy_referral_code, count)),
+        ('промо-код, secrets', per_call_us(referral_codes.generate, count)),
+        ('код активации, random.choice', per_call_us(legacy_auth_code, count)),
+        ('код активации, secrets', per_call_us(auth_codes.generate, count)),
+        ('код активации, HMAC-SHA256', per_call_us(lambda: hash_auth_code('1234'), count)),
+    ]
+
+    started = time.perf_counter()
+    referral_codes.generate_many(count)
+    rows.append((f'промо-коды, пакет из {count}', (time.perf_counter() - started) / count * 1_000_000))
+
+    for name, cost in rows:
+        print(f'{name:<40}{cost:>10.2f}{1_000_000 / cost:>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
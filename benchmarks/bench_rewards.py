@@ -0,0 +1,72 @@
+"""
+Бенчмарк расчета многоуровневых реферальных вознаграждений на синтетических данных.
+
+Строит случайный лес приглашений (каждый пользователь приглашен одним из ранее зарегистрированных
+или никем) и замеряет время и пиковый расход памяти users.rewards.compute_rewards
+в обычном режиме и в режиме обработки частями. База данных не используется.
+
+Запуск из корня проекта:
+    python benchmarks/bench_rewards.py --users 1000000 10000000 --chunk-size 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from users.rewards import compute_rewards  # noqa: E402
+
+
+def synthetic_graph(total: int, referred_share: float, verified_share: float, seed: int = 0):
+    """
+    Возвращает массивы parents и base для total синтетических пользователей.
+    """
+    rng = np.random.default_rng(seed)
+    parents = (rng.random(total) * np.arange(total)).astype(np.int32)
+    parents[rng.random(total) >= referred_share] = -1
+    parents[0] = -1
+    base = (rng.random(total) < verified_share) * 100.0
+    return parents, base
+
+
+def measure(parents, base, levels, chunk_size):
+    tracemalloc.start()
+    started = time.perf_counter()
+    rewards = compute_rewards(parents, base, levels, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rewards, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--levels', type=float, nargs='+', default=[0.10, 0.05, 0.02])
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    parser.add_argument('--referred-share', type=float, default=0.7)
+    parser.add_argument('--verified-share', type=float, default=0.8)
+    args = parser.parse_args()
+
+    print(f'{"пользователей":>14}{"режим":>12}{"время, с":>10}{"пик памяти, МБ":>16}')
+    for total in args.users:
+        parents, base = synthetic_graph(total, args.referred_share, args.verified_share)
+        full, elapsed, peak = measure(parents, base, args.levels, None)
+        print(f'{total:>14}{"целиком":>12}{elapsed:>10.2f}{peak / 2 ** 20:>16.1f}')
+        chunked, elapsed, peak = measure(parents, base, args.levels, args.chunk_size)
+        print(f'{total:>14}{"частями":>12}{elapsed:>10.2f}{peak / 2 ** 20:>16.1f}')
+        assert np.allclose(full, chunked)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Микробенчмарк сериализации ответов /login/, /verification/ и /profile/.
+
+Сравнивает процессорное время на один запрос для сериализаторов DRF со стандартным JSONRenderer
+и для облегченных представлений из users.projections с ORJSONRenderer.
+Тестовые пользователи создаются в транзакции, которая откатывается после замера.
+
+Запуск из корня проекта (нужна настроенная база данных):
+    python benchmarks/bench_serializers.py --iterations 5000 --referrals 20
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from users.models import User  # noqa: E402
+from users.projections import TokenData, login_response, profile_data  # noqa: E402
+from users.renderers import ORJSONRenderer  # noqa: E402
+from users.serializers import LoginSerializer, ProfileSerializer, TokenResponseSerializer  # noqa: E402
+
+
+def cpu_time_per_call(func, iterations: int) -> float:
+    """
+    Возвращает среднее процессорное время одного вызова func в микросекундах.
+    """
+    func()  # прогрев
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--referrals', type=int, default=10, help='количество приглашенных пользователей в профиле')
+    args = parser.parse_args()
+
+    json_renderer = JSONRenderer()
+    orjson_renderer = ORJSONRenderer()
+
+    with transaction.atomic():
+        user = User.objects.create(phone_number='+79990000000', referral_code='BENCH0')
+        User.objects.bulk_create(
+            User(phone_number=f'+7999{i:07d}', referred_by=user) for i in range(1, args.referrals + 1)
+        )
+        key = 'a' * 40
+
+        def login_drf():
+            data = {
+                "user": LoginSerializer(user).data,
+                "next_page": f"http://127.0.0.1:8000/verification/{user.pk}",
+                "message": "SMS с токеном отправлено на указанный номер телефона",
+            }
+            return json_renderer.render(data)
+
+        def token_drf():
+            serializer = TokenResponseSerializer(data={"token": key, }, partial=True)
+            serializer.is_valid()
+            return json_renderer.render(serializer.data)
+
+        cases = [
+            ('/login/', login_drf, lambda: orjson_renderer.render(login_response(user))),
+            ('/verification/', token_drf, lambda: orjson_renderer.render(TokenData(token=key))),
+            ('/profile/', lambda: json_renderer.render(ProfileSerializer(user).data),
+             lambda: orjson_renderer.render(profile_data(user))),
+        ]
+
+        print(f'{"endpoint":<16}{"drf, мкс":>12}{"fast, мкс":>12}{"ускорение":>12}')
+        for name, current, fast in cases:
+            current_time = cpu_time_per_call(current, args.iterations)
+            fast_time = cpu_time_per_call(fast, args.iterations)
+            print(f'{name:<16}{current_time:>12.1f}{fast_time:>12.1f}{current_time / fast_time:>11.1f}x')
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Бенчмарк пропускной способности доставки уведомлений из outbox.
+
+Поднимает локальный HTTP-сервер-заглушку, создает получателей и события в outbox
+и замеряет, сколько событий в секунду доставляет users.outbox.WebhookDeliveryWorker.
+Воркер обрабатывает только события созданных получателей; учитываются только доставленные события.
+Созданные получатели и события удаляются после замера.
+
+Запуск из корня проекта (нужна настроенная база данных):
+    python benchmarks/bench_webhooks.py --events 20000 --endpoints 4 --batch-size 100 --concurrency 8
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from users.models import OutboxEvent, WebhookEndpoint  # noqa: E402
+from users.outbox import USER_VERIFIED, WebhookDeliveryWorker  # noqa: E402
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=20_000)
+    parser.add_argument('--endpoints', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0, help='искусственная задержка ответа получателя, с')
+    args = parser.parse_args()
+
+    if args.latency:
+        handle = Handler.do_POST
+        Handler.do_POST = lambda self: (time.sleep(args.latency), handle(self))
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/hook'
+
+    endpoints = WebhookEndpoint.objects.bulk_create(
+        WebhookEndpoint(url=f'{url}/{i}', secret='bench') for i in range(args.endpoints)
+    )
+    try:
+        OutboxEvent.objects.bulk_create(
+            (OutboxEvent(endpoint=endpoints[i % args.endpoints], event_type=USER_VERIFIED,
+                         payload={'user_id': i, 'phone_number': '+79990000000'})
+             for i in range(args.events)),
+            batch_size=5000,
+        )
+        # Воркер ограничен получателями бенчмарка, чтобы не трогать настоящие события в базе данных.
+        worker = WebhookDeliveryWorker(endpoint_ids=[endpoint.pk for endpoint in endpoints],
+                                       batch_size=args.batch_size, concurrency=args.concurrency)
+
+        started = time.perf_counter()
+        while worker.deliver_once():
+            pass
+        elapsed = time.perf_counter() - started
+        delivered = OutboxEvent.objects.filter(endpoint__in=endpoints, status=OutboxEvent.STATUS_DELIVERED).count()
+
+        print(f'Доставлено событий: {delivered} за {elapsed:.2f} с ({delivered / elapsed:.0f} событий/с, '
+              f'{args.endpoints} получателей, пакет {args.batch_size}, параллельно {args.concurrency})')
+    finally:
+        WebhookEndpoint.objects.filter(pk__in=[endpoint.pk for endpoint in endpoints]).delete()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
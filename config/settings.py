@@ -52,6 +52,7 @@ USER_APPS = [
 INSTALLED_APPS = STANDARD_APPS + USER_APPS
 
 MIDDLEWARE = [
+    'users.middleware.SamplingProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -146,9 +147,70 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.TokenAuthentication'
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # JSON рендерится и разбирается C-расширением orjson.
+    'DEFAULT_RENDERER_CLASSES': [
+        'users.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'users.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Реферальная система',
     'DESCRIPTION': 'Выпускная дипломная работа Ведищев А.М.',
+    'VERSION': '1.0.0',
 }
+
+# Каталог с артефактами схемы OpenAPI, которые создает команда build_schema.
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'schema'
+# Отдавать ли схему из артефакта. При разработке схема генерируется из кода, чтобы изменения API
+# были видны сразу; образ Docker и профиль production включают артефакт (OPENAPI_SCHEMA_USE_ARTIFACT=1).
+OPENAPI_SCHEMA_USE_ARTIFACT = os.getenv('OPENAPI_SCHEMA_USE_ARTIFACT') == '1'
+
+# Фильтр Блума выданных промо-кодов (см. users.referral_filter).
+# При 20 млн кодов и доле ложноположительных ответов 1% фильтр занимает около 23 МБ памяти.
+REFERRAL_CODE_FILTER = {
+    'CAPACITY': 20_000_000,
+    'ERROR_RATE': 0.01,
+    'PATH': BASE_DIR / 'var' / 'referral_codes.bloom',
+    # Секунд между догрузками новых кодов из базы данных. Это же максимальное отставание фильтра:
+    # код, выданный другим процессом, может быть отклонен в течение REFRESH_INTERVAL после выдачи.
+    'REFRESH_INTERVAL': 1,
+}
+
+# Доли реферального вознаграждения по уровням цепочки приглашений (см. users.rewards).
+REFERRAL_REWARD_LEVELS = [0.10, 0.05, 0.02]
+# Базовая сумма, от которой начисляется вознаграждение за каждого верифицированного пользователя.
+REFERRAL_REWARD_BASE_AMOUNT = 100
+
+# Доставка уведомлений партнерам из outbox (см. users.outbox).
+WEBHOOK_DELIVERY = {
+    'BATCH_SIZE': 100,  # событий в одном запросе к получателю
+    'CONCURRENCY': 8,  # одновременных запросов
+    'TIMEOUT': 5,  # секунд на запрос
+    'MAX_ATTEMPTS': 10,  # после этого событие получает статус «Не доставлено»
+    'BACKOFF_BASE': 2,  # секунд до первой повторной попытки
+    'BACKOFF_MAX': 60 * 60,
+    'LEASE': 60,  # секунд, на которые воркер захватывает события
+    'POLL_INTERVAL': 1,
+}
+
+# Сэмплирующий профилировщик запросов (см. users.middleware.SamplingProfilerMiddleware).
+# По умолчанию выключен; включается переменной окружения REQUEST_PROFILER_ENABLED=1.
+REQUEST_PROFILER = {
+    'ENABLED': os.getenv('REQUEST_PROFILER_ENABLED') == '1',
+    'SAMPLE_RATE': float(os.getenv('REQUEST_PROFILER_SAMPLE_RATE', 0)),  # доля профилируемых запросов
+    'PATHS': ['/login/', '/verification/', '/profile/'],
+    'HEADER': 'X-Profile-Token',  # заголовок с токеном из команды profile_token
+    'TOKEN_MAX_AGE': 60 * 60,
+    'INTERVAL': 0.005,  # секунд между сэмплами
+    'DIRECTORY': BASE_DIR / 'var' / 'profiles',
+    'MAX_FILES': 1000,
+}
+
+# Ключ, которым хешируются коды активации перед сохранением в базу данных (см. users.codes).
+AUTH_CODE_HASH_KEY = os.getenv('AUTH_CODE_HASH_KEY') or SECRET_KEY
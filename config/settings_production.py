@@ -0,0 +1,56 @@
+"""
+Production settings profile for config project.
+
+Extends config.settings and trims applications and middleware the API does not use at runtime
+(admin, sessions, messages, static files, Browsable API, Swagger UI), so workers boot faster.
+The OpenAPI schema is served from the artifact built by `python manage.py build_schema`.
+
+Usage:
+    DJANGO_SETTINGS_MODULE=config.settings_production gunicorn config.wsgi
+"""
+from config.settings import *  # noqa: F401,F403
+from config.settings import REST_FRAMEWORK, TEMPLATES
+
+DEBUG = False
+
+# Схема OpenAPI отдается из артефакта, созданного при сборке.
+OPENAPI_SCHEMA_USE_ARTIFACT = True
+
+STANDARD_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+]
+
+USER_APPS = [
+    'rest_framework',
+    'phonenumber_field',
+    'rest_framework.authtoken',
+    'users',
+]
+
+INSTALLED_APPS = STANDARD_APPS + USER_APPS
+
+# API аутентифицируется токеном, поэтому сессии, CSRF и сообщения не нужны.
+MIDDLEWARE = [
+    'users.middleware.SamplingProfilerMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'users.renderers.ORJSONRenderer',
+    ],
+}
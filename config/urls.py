@@ -14,13 +14,25 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+from users.schema import schema_view
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('', include('users.urls')),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/schima/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('api/schema/', schema_view, name='schema'),
 ]
+
+# Админка и Swagger UI подключаются, только если их приложения установлены (в config.settings_production их нет).
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+if 'drf_spectacular' in settings.INSTALLED_APPS:
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    urlpatterns.append(
+        path('api/schima/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui')
+    )
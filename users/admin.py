@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from users.models import User
+from users.models import User, WebhookEndpoint, OutboxEvent
 
 # Register your models here.
 admin.site.register(User)
+admin.site.register(WebhookEndpoint)
+admin.site.register(OutboxEvent)
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        # Расширения схемы OpenAPI нужны только вместе с drf-spectacular (в config.settings_production его нет).
+        if 'drf_spectacular' in settings.INSTALLED_APPS:
+            import users.openapi  # noqa: F401
@@ -0,0 +1,68 @@
+import secrets
+import string
+from typing import List
+
+from django.conf import settings
+from django.utils.crypto import salted_hmac
+
+REFERRAL_CODE_ALPHABET = string.ascii_uppercase + string.digits
+REFERRAL_CODE_LENGTH = 6
+AUTH_CODE_ALPHABET = '123456789'
+AUTH_CODE_LENGTH = 4
+
+# Соль ключа, которым хешируются коды активации.
+AUTH_CODE_HASH_SALT = 'users.codes.auth_code'
+
+
+class CodeGenerator:
+    """
+    Класс CodeGenerator генерирует коды заданной длины из заданного алфавита с помощью модуля secrets.
+    Случайные байты переводятся в символы алфавита одним вызовом bytes.translate() по заранее
+    построенной таблице. Байты, не попадающие в кратный длине алфавита диапазон, отбрасываются,
+    поэтому символы распределены равномерно.
+    """
+
+    def __init__(self, alphabet: str, length: int):
+        self.length = length
+        # Наибольшее кратное длине алфавита число, не превышающее 256: байты от него и выше отбрасываются.
+        limit = 256 - 256 % len(alphabet)
+        self._table = bytes(ord(alphabet[byte % len(alphabet)]) if byte < limit else 0 for byte in range(256))
+        self._rejected = bytes(range(limit, 256))
+        self._accept_ratio = limit / 256
+
+    def _random_chars(self, count: int) -> str:
+        chars = b''
+        while len(chars) < count:
+            missing = count - len(chars)
+            chars += secrets.token_bytes(int(missing / self._accept_ratio) + 8).translate(self._table, self._rejected)
+        return chars[:count].decode('ascii')
+
+    def generate(self) -> str:
+        """
+        Генерирует один код.
+        """
+        return self._random_chars(self.length)
+
+    def generate_many(self, count: int) -> List[str]:
+        """
+        Генерирует count кодов за один вызов генератора случайных чисел (для импорта и заполнения данных).
+        Коды не проверяются на уникальность.
+        """
+        chars = self._random_chars(count * self.length)
+        return [chars[start:start + self.length] for start in range(0, len(chars), self.length)]
+
+
+referral_codes = CodeGenerator(REFERRAL_CODE_ALPHABET, REFERRAL_CODE_LENGTH)
+auth_codes = CodeGenerator(AUTH_CODE_ALPHABET, AUTH_CODE_LENGTH)
+
+
+def hash_auth_code(code: str) -> str:
+    """
+    Функция вычисляет ключевой хеш (HMAC-SHA256) кода активации для хранения в базе данных.
+    Ключ задается настройкой AUTH_CODE_HASH_KEY, поэтому по утечке таблицы коды не восстановить перебором.
+    :param code: код активации
+    :return: хеш кода в шестнадцатеричном виде
+    """
+    return salted_hmac(AUTH_CODE_HASH_SALT, str(code), secret=settings.AUTH_CODE_HASH_KEY,
+                       algorithm='sha256').hexdigest()
+
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from users.models import User
+from users.utils import generate_referral_codes
+
+
+class Command(BaseCommand):
+    """
+    Команда присваивает промо-коды пользователям, у которых их нет (например, после импорта).
+    Коды генерируются пакетами; коды, которые уже заняты в базе данных или повторились в пакете, заменяются.
+    """
+    help = 'Присваивает промо-коды пользователям без промо-кода пакетами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='пользователей в одном пакете')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        updated = 0
+        while True:
+            users = list(User.objects.filter(referral_code__isnull=True).order_by('pk')[:batch_size])
+            if not users:
+                break
+
+            codes = set()
+            while len(codes) < len(users):
+                candidates = set(generate_referral_codes(len(users) - len(codes))) - codes
+                taken = set(User.objects.filter(referral_code__in=candidates).values_list('referral_code', flat=True))
+                codes |= candidates - taken
+
+            for user, code in zip(users, codes):
+                user.referral_code = code
+            User.objects.bulk_update(users, ['referral_code'])
+            updated += len(users)
+
+        self.stdout.write(self.style.SUCCESS(f'Промо-коды присвоены {updated} пользователям'))
@@ -0,0 +1,48 @@
+import random
+import string
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.referral_filter import ReferralCodeFilter
+
+
+class Command(BaseCommand):
+    """
+    Команда перестраивает фильтр Блума выданных промо-кодов по базе данных и сохраняет его снимок.
+    Воркеры загружают снимок при первой проверке промо-кода.
+    """
+    help = 'Перестраивает снимок фильтра выданных промо-кодов и выводит долю ложноположительных ответов и объем памяти.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true', help='только вывести статистику существующего снимка')
+        parser.add_argument('--probe', type=int, default=100_000,
+                            help='количество заведомо не выданных кодов для измерения доли ложноположительных ответов')
+
+    def handle(self, *args, **options):
+        code_filter = ReferralCodeFilter()
+        path = Path(code_filter.config()['PATH'])
+
+        if options['stats']:
+            if not path.exists():
+                raise CommandError(f'Снимок фильтра не найден: {path}')
+            code_filter.load(path.read_bytes())
+        else:
+            started = time.monotonic()
+            code_filter.rebuild()
+            code_filter.save(path)
+            self.stdout.write(self.style.SUCCESS(f'Снимок сохранен: {path} ({time.monotonic() - started:.1f} с)'))
+
+        bloom = code_filter.bloom
+        self.stdout.write(f'Промо-кодов: {bloom.count}, водяной знак: id {code_filter.watermark}, '
+                          f'пользователей без промо-кода: {len(code_filter.pending)}')
+        self.stdout.write(f'Память: {bloom.memory_bytes / 2 ** 20:.1f} МБ '
+                          f'({bloom.size} бит, хеш-функций: {bloom.hash_count})')
+        self.stdout.write(f'Доля ложноположительных ответов (оценка): {bloom.false_positive_rate:.4%}')
+
+        if options['probe']:
+            # Промо-коды состоят из заглавных букв и цифр, поэтому коды из строчных букв заведомо не выдавались.
+            hits = sum(''.join(random.choices(string.ascii_lowercase, k=6)) in bloom for _ in range(options['probe']))
+            self.stdout.write(f'Доля ложноположительных ответов (измерено на {options["probe"]} кодах): '
+                              f'{hits / options["probe"]:.4%}')
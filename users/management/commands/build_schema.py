@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from users.schema import render_schema, schema_artifact_path
+
+
+class Command(BaseCommand):
+    """
+    Команда генерирует схему OpenAPI и сохраняет ее как версионированный артефакт.
+    Запускается при сборке или развертывании, после чего /api/schema/ отдает готовый файл без интроспекции.
+    """
+    help = 'Генерирует схему OpenAPI в OPENAPI_SCHEMA_DIR (openapi-<версия>.yaml и openapi-<версия>.json).'
+
+    def handle(self, *args, **options):
+        for fmt, content in render_schema().items():
+            path = schema_artifact_path(fmt)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            self.stdout.write(self.style.SUCCESS(f'Схема сохранена: {path} ({len(content)} байт)'))
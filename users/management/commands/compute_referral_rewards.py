@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.rewards import run_reward_calculation
+
+
+class Command(BaseCommand):
+    """
+    Команда пересчитывает реферальные вознаграждения по всем цепочкам приглашений и сохраняет их в ReferralReward.
+    """
+    help = 'Рассчитывает многоуровневые реферальные вознаграждения пакетным векторным расчетом.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--levels', type=float, nargs='+', default=settings.REFERRAL_REWARD_LEVELS,
+                            help='доли вознаграждения по уровням, например: --levels 0.1 0.05 0.02')
+        parser.add_argument('--base-amount', type=float, default=settings.REFERRAL_REWARD_BASE_AMOUNT,
+                            help='базовая сумма за каждого верифицированного пользователя')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='обрабатывать пользователей частями заданного размера; ограничивает только '
+                                 'временные массивы, граф и вознаграждения хранятся в памяти целиком')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        saved = run_reward_calculation(options['levels'], options['base_amount'], options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Вознаграждения рассчитаны для {saved} пользователей за {time.monotonic() - started:.1f} с'
+        ))
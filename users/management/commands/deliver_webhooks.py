@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from users.outbox import WebhookDeliveryWorker
+
+
+class Command(BaseCommand):
+    """
+    Команда запускает воркер доставки уведомлений партнерам из outbox.
+    """
+    help = 'Доставляет события из outbox получателям пакетами с повторными попытками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='выполнить один цикл доставки и завершиться')
+        parser.add_argument('--batch-size', type=int, help='событий в одном запросе к получателю')
+        parser.add_argument('--concurrency', type=int, help='одновременных запросов')
+
+    def handle(self, *args, **options):
+        worker = WebhookDeliveryWorker(batch_size=options['batch_size'], concurrency=options['concurrency'])
+        if options['once']:
+            self.stdout.write(f'Обработано событий: {worker.deliver_once()}')
+        else:
+            worker.run()
@@ -0,0 +1,55 @@
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.profiling import read_profiles
+
+
+class Command(BaseCommand):
+    """
+    Команда объединяет сохраненные профили запросов и выводит самые нагруженные функции.
+    Собственное время функции — сэмплы, в которых она находится на вершине стека;
+    общее время — сэмплы, в которых она присутствует в стеке.
+    Фильтр --prefix отбирает строки отчета, но не меняет расчет: время в sleep, драйвере базы данных
+    и других внешних функциях не переносится на вызвавшую их функцию приложения.
+    """
+    help = 'Сводный отчет по профилям запросов: top-N функций по собственному и общему времени.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='количество функций в отчете')
+        parser.add_argument('--prefix', action='append', default=[],
+                            help='показывать только функции модулей с этим префиксом (например, users.); '
+                                 'можно указать несколько раз')
+        parser.add_argument('--directory', default=settings.REQUEST_PROFILER['DIRECTORY'],
+                            help='каталог профилей')
+
+    def handle(self, *args, **options):
+        directory = Path(options['directory'])
+        if not directory.exists():
+            raise CommandError(f'Каталог профилей не найден: {directory}')
+
+        prefixes = tuple(options['prefix'])
+        own = Counter()
+        total = Counter()
+        samples = 0
+        for stack, count in read_profiles(directory):
+            samples += count
+            frames = stack.split(';')
+            # Собственное время всегда относится к вершине полного стека; префикс только отбирает строки отчета.
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+
+        if not samples:
+            raise CommandError(f'В каталоге {directory} нет профилей.')
+
+        self.stdout.write(f'Профилей: {len(list(directory.glob("*.folded")))}, сэмплов: {samples}')
+        for title, counter in (('Собственное время', own), ('Общее время', total)):
+            self.stdout.write(f'\n{title}:')
+            self.stdout.write(f'{"%":>7}{"сэмплы":>9}  функция')
+            rows = [(frame, count) for frame, count in counter.most_common()
+                    if not prefixes or frame.startswith(prefixes)]
+            for frame, count in rows[:options['top']]:
+                self.stdout.write(f'{count / samples * 100:>7.1f}{count:>9}  {frame}')
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.profiling import make_profile_token
+
+
+class Command(BaseCommand):
+    """
+    Команда выдает подписанный токен, с которым запрос профилируется независимо от доли SAMPLE_RATE.
+    """
+    help = 'Выводит значение заголовка для профилирования отдельного запроса.'
+
+    def handle(self, *args, **options):
+        config = settings.REQUEST_PROFILER
+        self.stdout.write(f'{config["HEADER"]}: {make_profile_token()}')
+        self.stdout.write(f'Токен действует {config["TOKEN_MAX_AGE"]} с.')
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Команда строит отчет о времени импорта при старте воркера.
+    Модуль точки входа (config.wsgi или config.asgi) импортируется в отдельном процессе с ключом -X importtime,
+    после чего время импорта суммируется по пакетам верхнего уровня.
+    """
+    help = 'Отчет о времени импорта config.wsgi/config.asgi в разбивке по пакетам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='config.wsgi', choices=['config.wsgi', 'config.asgi'],
+                            help='модуль точки входа')
+        parser.add_argument('--no-urls', action='store_true',
+                            help='не импортировать ROOT_URLCONF (по умолчанию он загружается, как при первом запросе)')
+        parser.add_argument('--top', type=int, default=20, help='количество строк в отчете')
+
+    def handle(self, *args, **options):
+        code = f'import {options["module"]}'
+        if not options['no_urls']:
+            code += '; from django.conf import settings; __import__(settings.ROOT_URLCONF)'
+
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            # Строки -X importtime пропускаем: сообщение об ошибке — последняя из остальных строк stderr.
+            errors = [line for line in result.stderr.splitlines()
+                      if line.strip() and not line.startswith('import time:')]
+            raise CommandError(errors[-1] if errors else f'Процесс завершился с кодом {result.returncode}')
+
+        packages = defaultdict(int)
+        modules = []
+        for line in result.stderr.splitlines():
+            # Формат строки: "import time:       self |  cumulative | package.module"
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            name = name.strip()
+            packages[name.split('.')[0]] += int(self_us)
+            modules.append((int(cumulative_us), name))
+
+        total = sum(packages.values())
+        self.stdout.write(f'{options["module"]} ({settings.SETTINGS_MODULE}): '
+                          f'{len(modules)} модулей, {total / 1000:.1f} мс')
+
+        self.stdout.write(f'\n{"пакет":<40}{"мс":>10}{"%":>8}')
+        for name, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:options['top']]:
+            self.stdout.write(f'{name:<40}{self_us / 1000:>10.1f}{self_us / total * 100:>8.1f}')
+
+        self.stdout.write(f'\n{"модуль (с зависимостями)":<60}{"мс":>10}')
+        for cumulative_us, name in sorted(modules, reverse=True)[:options['top']]:
+            self.stdout.write(f'{name:<60}{cumulative_us / 1000:>10.1f}')
@@ -0,0 +1,65 @@
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from users.profiling import StackSampler, check_profile_token, profile_name, write_profile
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfilerMiddleware:
+    """
+    Класс SamplingProfilerMiddleware профилирует часть запросов сэмплирующим профилировщиком.
+    Профилируются запросы к путям из PATHS: случайная доля SAMPLE_RATE и запросы с подписанным заголовком HEADER
+    (значение выдает команда profile_token). Профили сохраняются в DIRECTORY, где хранится не более MAX_FILES файлов;
+    сводный отчет строит команда profile_report.
+    Если профилировщик выключен (ENABLED), Django исключает middleware из обработки запросов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = settings.REQUEST_PROFILER
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed
+
+    def should_profile(self, request) -> bool:
+        """
+        Определяет, нужно ли профилировать запрос.
+        """
+        if not request.path.startswith(tuple(self.config['PATHS'])):
+            return False
+        token = request.headers.get(self.config['HEADER'])
+        if token and check_profile_token(token, self.config['TOKEN_MAX_AGE']):
+            return True
+        return random.random() < self.config['SAMPLE_RATE']
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), self.config['INTERVAL'])
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            stacks = sampler.stop()
+            # Запрос короче интервала сэмплирования может не дать ни одного сэмпла.
+            if stacks:
+                self.save(request, stacks, time.perf_counter() - started)
+
+    def save(self, request, stacks, elapsed: float) -> None:
+        """
+        Сохраняет профиль запроса. Ошибка записи профиля только логируется:
+        профилирование не должно менять ответ на запрос.
+        """
+        try:
+            write_profile(Path(self.config['DIRECTORY']), profile_name(request, elapsed), stacks,
+                          self.config['MAX_FILES'])
+        except Exception:
+            logger.exception('Не удалось сохранить профиль запроса %s %s', request.method, request.path)
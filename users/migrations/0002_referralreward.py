@@ -0,0 +1,28 @@
+# Generated by Django 4.2.5 on 2026-10-19 03:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferralReward',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Сумма вознаграждения')),
+                ('computed_at', models.DateTimeField(verbose_name='Дата расчета')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='referral_reward', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Реферальное вознаграждение',
+                'verbose_name_plural': 'Реферальные вознаграждения',
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.5 on 2026-10-19 03:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_referralreward'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(verbose_name='URL получателя')),
+                ('secret', models.CharField(blank=True, max_length=128, verbose_name='Ключ подписи')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Флаг активности')),
+            ],
+            options={
+                'verbose_name': 'Получатель уведомлений',
+                'verbose_name_plural': 'Получатели уведомлений',
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=64, verbose_name='Тип события')),
+                ('payload', models.JSONField(verbose_name='Данные события')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает отправки'), ('delivered', 'Доставлено'), ('dead', 'Не доставлено')], default='pending', max_length=16, verbose_name='Статус')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Количество попыток')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время следующей попытки')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата доставки')),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='users.webhookendpoint', verbose_name='Получатель')),
+            ],
+            options={
+                'verbose_name': 'Событие для отправки',
+                'verbose_name_plural': 'События для отправки',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='users_outbo_status_83bc92_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.5 on 2026-10-19 03:30
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.crypto import salted_hmac
+
+# Хеширование повторяет users.codes.hash_auth_code на момент миграции и не зависит от кода приложения.
+AUTH_CODE_HASH_SALT = 'users.codes.auth_code'
+
+
+BATCH_SIZE = 1000
+
+
+def hash_existing_codes(apps, schema_editor):
+    # Таблица кодов растет с каждым входом, поэтому она обрабатывается пакетами по возрастанию id.
+    AuthCode = apps.get_model('users', 'AuthCode')
+    last_pk = 0
+    while True:
+        codes = list(AuthCode.objects.filter(pk__gt=last_pk).order_by('pk')[:BATCH_SIZE])
+        if not codes:
+            break
+        for auth_code in codes:
+            auth_code.code_hash = salted_hmac(AUTH_CODE_HASH_SALT, str(auth_code.code_hash),
+                                              secret=settings.AUTH_CODE_HASH_KEY, algorithm='sha256').hexdigest()
+        AuthCode.objects.bulk_update(codes, ['code_hash'])
+        last_pk = codes[-1].pk
+
+
+def delete_codes(apps, schema_editor):
+    # Хеши нельзя превратить обратно в коды; коды активации живут 10 минут, поэтому их можно удалить.
+    apps.get_model('users', 'AuthCode').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_outbox'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='authcode',
+            old_name='code',
+            new_name='code_hash',
+        ),
+        migrations.AlterField(
+            model_name='authcode',
+            name='code_hash',
+            field=models.CharField(max_length=64, verbose_name='Хеш кода активации'),
+        ),
+        migrations.RunPython(hash_existing_codes, delete_codes),
+    ]
@@ -1,8 +1,10 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
+from users.codes import hash_auth_code
 from users.utils import generate_referral_code, generate_auth_code
 
 
@@ -27,8 +29,7 @@ class CustomUserManager(BaseUserManager):
         if user.referral_code is None:  # проверяем есть ли промо-код
             user.referral_code = generate_referral_code()
             user.save()
-        code = AuthCode.objects.create(user=user)
-        code.save()
+        AuthCode.issue(user)
 
         return user
 
@@ -76,7 +77,8 @@ class AuthCode(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Пользователь')
     is_active = models.BooleanField(default=True, verbose_name='Флаг активности')
-    code = models.CharField(max_length=4, default=generate_auth_code, verbose_name='Код активации')
+    # Сам код не хранится: сохраняется только его ключевой хеш (см. users.codes.hash_auth_code).
+    code_hash = models.CharField(max_length=64, verbose_name='Хеш кода активации')
 
     class Meta:
         verbose_name = 'Код активации'
@@ -84,4 +86,73 @@ class AuthCode(models.Model):
         ordering = ['-id']
 
     def __str__(self):
-        return f'{self.code}'
+        return f'{self.user}: {self.code_hash[:8]}'
+
+    @classmethod
+    def issue(cls, user: User) -> str:
+        """
+        Метод создает новый код активации пользователя. В базе данных сохраняется только хеш кода.
+        :param user: экземпляр пользователя
+        :return: код активации для отправки пользователю
+        """
+        code = generate_auth_code()
+        cls.objects.create(user=user, code_hash=hash_auth_code(code))
+        return code
+
+
+class ReferralReward(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='referral_reward',
+                                verbose_name='Пользователь')
+    amount = models.DecimalField(max_digits=14, decimal_places=2, verbose_name='Сумма вознаграждения')
+    computed_at = models.DateTimeField(verbose_name='Дата расчета')
+
+    class Meta:
+        verbose_name = 'Реферальное вознаграждение'
+        verbose_name_plural = 'Реферальные вознаграждения'
+
+    def __str__(self):
+        return f'{self.user}: {self.amount}'
+
+
+class WebhookEndpoint(models.Model):
+    url = models.URLField(verbose_name='URL получателя')
+    secret = models.CharField(max_length=128, blank=True, verbose_name='Ключ подписи')
+    is_active = models.BooleanField(default=True, verbose_name='Флаг активности')
+
+    class Meta:
+        verbose_name = 'Получатель уведомлений'
+        verbose_name_plural = 'Получатели уведомлений'
+
+    def __str__(self):
+        return self.url
+
+
+class OutboxEvent(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_DELIVERED = 'delivered'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Ожидает отправки'),
+        (STATUS_DELIVERED, 'Доставлено'),
+        (STATUS_DEAD, 'Не доставлено'),
+    ]
+
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='events',
+                                 verbose_name='Получатель')
+    event_type = models.CharField(max_length=64, verbose_name='Тип события')
+    payload = models.JSONField(verbose_name='Данные события')
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='Статус')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Количество попыток')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Время следующей попытки')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    delivered_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата доставки')
+
+    class Meta:
+        verbose_name = 'Событие для отправки'
+        verbose_name_plural = 'События для отправки'
+        ordering = ['id']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f'{self.event_type} -> {self.endpoint}'
@@ -0,0 +1,20 @@
+from drf_spectacular.extensions import OpenApiViewExtension
+from drf_spectacular.utils import extend_schema
+
+from users.serializers import VerificationAuthCodeSerializer, TokenResponseSerializer
+
+
+class VerificationTokenViewExtension(OpenApiViewExtension):
+    """
+    Расширение drf-spectacular описывает запрос и ответ VerificationTokenView.
+    Описание вынесено из users.views, чтобы представления не импортировали drf-spectacular при старте воркера.
+    Модуль загружается в UsersConfig.ready() и перед генерацией схемы.
+    """
+    target_class = 'users.views.VerificationTokenView'
+
+    def view_replacement(self):
+        @extend_schema(request=VerificationAuthCodeSerializer, responses=TokenResponseSerializer)
+        class Fixed(self.target_class):
+            pass
+
+        return Fixed
@@ -0,0 +1,201 @@
+import hashlib
+import hmac
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Min
+from django.utils import timezone
+
+from users.models import OutboxEvent, User, WebhookEndpoint
+
+# Типы событий, о которых уведомляются партнеры.
+USER_VERIFIED = 'user.verified'
+REFERRAL_ACTIVATED = 'referral.activated'
+
+
+def enqueue_event(event_type: str, payload: dict) -> None:
+    """
+    Функция записывает событие в outbox для каждого активного получателя.
+    Вызывается в той же транзакции, что и изменение состояния, поэтому событие сохраняется тогда и только тогда,
+    когда сохраняется само изменение. Отправка выполняется отдельно командой deliver_webhooks.
+    :param event_type: тип события
+    :param payload: данные события
+    """
+    OutboxEvent.objects.bulk_create(
+        OutboxEvent(endpoint_id=endpoint_id, event_type=event_type, payload=payload)
+        for endpoint_id in WebhookEndpoint.objects.filter(is_active=True).values_list('pk', flat=True)
+    )
+
+
+def user_verified_payload(user: User) -> dict:
+    """
+    Данные события о верификации пользователя.
+    """
+    return {
+        'user_id': user.pk,
+        'phone_number': str(user.phone_number),
+        'occurred_at': timezone.now().isoformat(),
+    }
+
+
+def referral_activated_payload(user: User) -> dict:
+    """
+    Данные события об активации промо-кода пользователем.
+    """
+    return {
+        'user_id': user.pk,
+        'phone_number': str(user.phone_number),
+        'referrer_id': user.referred_by_id,
+        'referral_code': user.referred_by.referral_code,
+        'occurred_at': timezone.now().isoformat(),
+    }
+
+
+class WebhookDeliveryWorker:
+    """
+    Класс WebhookDeliveryWorker доставляет события из outbox получателям.
+
+    За один цикл воркер захватывает готовые к отправке события и группирует их по получателям,
+    не более BATCH_SIZE событий в одном запросе. Одному получателю отправляется не более одного пакета за цикл,
+    а всего за цикл захватывается не более CONCURRENCY пакетов, которые отправляются одновременно.
+    Поэтому цикл длится не дольше одного TIMEOUT, а захваченные события получают аренду на LEASE секунд
+    (LEASE должен быть больше TIMEOUT), и несколько воркеров не отправят их повторно.
+    Получатели выбираются по самому старому готовому событию, так что накопившаяся очередь одного получателя
+    не задерживает доставку остальным.
+    Неудачная отправка повторяется с экспоненциальной задержкой; после MAX_ATTEMPTS попыток
+    событие получает статус «Не доставлено» и остается в таблице для разбора.
+    """
+
+    def __init__(self, endpoint_ids: Optional[Iterable[int]] = None, **options):
+        """
+        :param endpoint_ids: если задан, воркер доставляет события только этих получателей
+        :param options: переопределения настроек WEBHOOK_DELIVERY (batch_size, concurrency и т.д.)
+        """
+        self.endpoint_ids = None if endpoint_ids is None else list(endpoint_ids)
+        config = {**settings.WEBHOOK_DELIVERY, **{key.upper(): value for key, value in options.items()
+                                                  if value is not None}}
+        self.batch_size = config['BATCH_SIZE']
+        self.concurrency = config['CONCURRENCY']
+        self.timeout = config['TIMEOUT']
+        self.max_attempts = config['MAX_ATTEMPTS']
+        self.backoff_base = config['BACKOFF_BASE']
+        self.backoff_max = config['BACKOFF_MAX']
+        self.lease = config['LEASE']
+        self.poll_interval = config['POLL_INTERVAL']
+
+    def claim(self) -> List[Tuple[WebhookEndpoint, List[OutboxEvent]]]:
+        """
+        Захватывает готовые к отправке события и возвращает их пакетами по получателям,
+        не более CONCURRENCY пакетов за раз.
+        Сначала выбираются до CONCURRENCY получателей с самыми старыми готовыми событиями,
+        затем для каждого из них блокируется до BATCH_SIZE событий.
+        """
+        now = timezone.now()
+        due = OutboxEvent.objects.filter(status=OutboxEvent.STATUS_PENDING, next_attempt_at__lte=now,
+                                         endpoint__is_active=True)
+        if self.endpoint_ids is not None:
+            due = due.filter(endpoint_id__in=self.endpoint_ids)
+
+        with transaction.atomic():
+            endpoint_ids = list(due.values('endpoint_id').annotate(oldest=Min('id')).order_by('oldest')
+                                .values_list('endpoint_id', flat=True)[:self.concurrency])
+            batches: Dict[int, List[OutboxEvent]] = {}
+            for endpoint_id in endpoint_ids:
+                events = list(due.filter(endpoint_id=endpoint_id)
+                              .select_for_update(skip_locked=True, of=('self',))
+                              .order_by('id')[:self.batch_size])
+                if events:  # события могли быть захвачены другим воркером
+                    batches[endpoint_id] = events
+            claimed = [event.pk for events in batches.values() for event in events]
+            OutboxEvent.objects.filter(pk__in=claimed).update(next_attempt_at=now + timedelta(seconds=self.lease))
+
+        endpoints = WebhookEndpoint.objects.in_bulk(list(batches))
+        return [(endpoints[endpoint_id], events) for endpoint_id, events in batches.items()]
+
+    def send(self, endpoint: WebhookEndpoint, events: List[OutboxEvent]) -> Optional[str]:
+        """
+        Отправляет пакет событий одним POST-запросом.
+        Если у получателя задан ключ, тело запроса подписывается HMAC-SHA256 в заголовке X-Webhook-Signature.
+        Любая ошибка (в том числе некорректный URL получателя) возвращается как неудачная попытка,
+        чтобы результаты остальных пакетов цикла были записаны.
+        :return: None при успешной доставке, иначе описание ошибки.
+        """
+        try:
+            body = json.dumps({'events': [
+                {'id': event.pk, 'type': event.event_type, 'payload': event.payload, 'created_at': event.created_at}
+                for event in events
+            ]}, cls=DjangoJSONEncoder).encode()
+            headers = {'Content-Type': 'application/json'}
+            if endpoint.secret:
+                headers['X-Webhook-Signature'] = hmac.new(endpoint.secret.encode(), body, hashlib.sha256).hexdigest()
+
+            request = urllib.request.Request(endpoint.url, data=body, headers=headers, method='POST')
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                return None
+        except urllib.error.HTTPError as exc:
+            return f'HTTP {exc.code}'
+        except (urllib.error.URLError, OSError) as exc:
+            return str(exc)
+        except Exception as exc:
+            return f'{type(exc).__name__}: {exc}'
+
+    def backoff(self, attempts: int) -> float:
+        """
+        Задержка перед следующей попыткой: экспоненциальная, ограниченная BACKOFF_MAX, со случайным разбросом.
+        """
+        delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+        return delay * random.uniform(0.5, 1)
+
+    def record(self, events: List[OutboxEvent], error: Optional[str]) -> None:
+        """
+        Сохраняет результат отправки пакета.
+        Доставленный пакет отмечается одним UPDATE; для недоставленного каждому событию
+        рассчитывается время следующей попытки.
+        """
+        now = timezone.now()
+        if error is None:
+            OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                status=OutboxEvent.STATUS_DELIVERED, delivered_at=now, attempts=F('attempts') + 1)
+            return
+
+        for event in events:
+            event.attempts += 1
+            event.last_error = error
+            if event.attempts >= self.max_attempts:
+                event.status = OutboxEvent.STATUS_DEAD
+            else:
+                event.next_attempt_at = now + timedelta(seconds=self.backoff(event.attempts))
+        OutboxEvent.objects.bulk_update(events, ['status', 'attempts', 'next_attempt_at', 'last_error'])
+
+    def deliver_once(self) -> int:
+        """
+        Выполняет один цикл доставки.
+        HTTP-запросы выполняются в пуле потоков, результаты записываются в базу данных в основном потоке.
+        :return: количество обработанных событий
+        """
+        batches = self.claim()
+        if not batches:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            errors = list(executor.map(lambda batch: self.send(*batch), batches))
+        with transaction.atomic():
+            for (_, events), error in zip(batches, errors):
+                self.record(events, error)
+        return sum(len(events) for _, events in batches)
+
+    def run(self) -> None:
+        """
+        Доставляет события в бесконечном цикле, ожидая POLL_INTERVAL секунд, когда отправлять нечего.
+        """
+        while True:
+            if not self.deliver_once():
+                time.sleep(self.poll_interval)
@@ -0,0 +1,28 @@
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from users.renderers import ORJSONRenderer
+
+
+class ORJSONParser(BaseParser):
+    """
+    Класс ORJSONParser — это парсер тела запроса в формате JSON на основе C-расширения orjson.
+    Заменяет стандартный JSONParser из rest_framework.parsers.
+    """
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Разбирает тело запроса и возвращает полученные данные.
+        :param stream: поток с телом запроса
+        :param media_type: тип содержимого запроса
+        :param parser_context: контекст парсера
+        :return: данные запроса
+        :raises ParseError: если тело запроса не является корректным JSON
+        """
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
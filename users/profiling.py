@@ -0,0 +1,122 @@
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from django.core import signing
+
+# Соль подписи заголовка, которым запрашивается профилирование конкретного запроса.
+TOKEN_SALT = 'users.profiling'
+
+
+def make_profile_token() -> str:
+    """
+    Функция создает подписанное значение заголовка для профилирования запроса.
+    :return: подписанный токен с меткой времени
+    """
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign('profile')
+
+
+def check_profile_token(token: str, max_age: int) -> bool:
+    """
+    Функция проверяет подпись и срок действия токена профилирования.
+    :param token: значение заголовка
+    :param max_age: срок действия токена в секундах
+    :return: True, если токен действителен
+    """
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+class StackSampler(threading.Thread):
+    """
+    Класс StackSampler — это сэмплирующий профилировщик одного потока.
+    С заданным интервалом он снимает стек вызовов профилируемого потока через sys._current_frames()
+    и подсчитывает одинаковые стеки. Профилируемый код не инструментируется, поэтому накладные расходы
+    определяются только частотой сэмплирования.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self) -> Counter:
+        """
+        Останавливает сэмплирование и возвращает собранные стеки.
+        :return: Counter вида «стек, разделенный ';'» -> количество сэмплов
+        """
+        self._stopped.set()
+        self.join()
+        return self.stacks
+
+
+def write_profile(directory: Path, name: str, stacks: Counter, max_files: int) -> Path:
+    """
+    Функция сохраняет профиль в формате свернутых стеков (flamegraph.pl, speedscope, inferno)
+    и удаляет самые старые профили, если их больше max_files.
+    Имена профилей начинаются с метки времени (см. profile_name), поэтому самые старые профили
+    определяются сортировкой имен без обращения к метаданным файлов. Профили, которые другой воркер
+    удалил во время ротации, пропускаются.
+    :param directory: каталог профилей
+    :param name: имя файла без расширения
+    :param stacks: собранные стеки
+    :param max_files: максимальное количество хранимых профилей
+    :return: путь к сохраненному профилю
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{name}.folded'
+    path.write_text(''.join(f'{stack} {count}\n' for stack, count in stacks.items()))
+
+    profiles = sorted(directory.glob('*.folded'))
+    for old in profiles[:-max_files]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def read_profiles(directory: Path) -> Iterator[Tuple[str, int]]:
+    """
+    Функция читает все сохраненные профили каталога.
+    :return: итератор пар (стек, количество сэмплов)
+    """
+    for path in sorted(directory.glob('*.folded')):
+        try:
+            lines = path.read_text().splitlines()
+        except FileNotFoundError:
+            continue  # профиль удален ротацией во время чтения
+        for line in lines:
+            stack, _, count = line.rpartition(' ')
+            if stack:
+                yield stack, int(count)
+
+
+def profile_name(request, elapsed: float) -> str:
+    """
+    Имя файла профиля: время запроса с микросекундами, метод, путь и длительность.
+    Имена упорядочены по времени, на этом основана ротация в write_profile.
+    """
+    now = time.time()
+    slug = request.path.strip('/').replace('/', '_') or 'root'
+    return f'{time.strftime("%Y%m%d-%H%M%S", time.gmtime(now))}-{int(now * 1_000_000) % 1_000_000:06d}-' \
+           f'{request.method}-{slug}-{elapsed * 1000:.0f}ms'
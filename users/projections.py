@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from users.models import User
+
+
+@dataclass(slots=True)
+class LoginUserData:
+    """
+    Облегченное представление пользователя в ответе LoginView.
+    Повторяет поля, которые возвращает LoginSerializer.
+    """
+    id: int
+    phone_number: str
+
+
+@dataclass(slots=True)
+class LoginResponseData:
+    """
+    Облегченное представление ответа LoginView.
+    """
+    user: LoginUserData
+    next_page: str
+    message: str
+
+
+@dataclass(slots=True)
+class TokenData:
+    """
+    Облегченное представление ответа VerificationTokenView.
+    Повторяет поля, которые возвращает TokenResponseSerializer.
+    """
+    token: str
+
+
+@dataclass(slots=True)
+class ReferralData:
+    """
+    Облегченное представление приглашенного пользователя.
+    Повторяет поля, которые возвращает ProfileForeignSerializer.
+    """
+    phone_number: str
+
+
+@dataclass(slots=True)
+class ProfileData:
+    """
+    Облегченное представление профиля пользователя в ответе ProfileView.
+    Повторяет поля, которые возвращает ProfileSerializer.
+    """
+    id: int
+    phone_number: str
+    referral_code: Optional[str]
+    first_name: str
+    last_name: str
+    email: str
+    entered_referral_code: List[ReferralData] = field(default_factory=list)
+
+
+def login_response(user: User) -> LoginResponseData:
+    """
+    Функция формирует ответ LoginView без создания экземпляра сериализатора.
+    :param user: экземпляр пользователя, которому отправлен код подтверждения
+    :return: экземпляр LoginResponseData
+    """
+    return LoginResponseData(
+        user=LoginUserData(id=user.pk, phone_number=str(user.phone_number)),
+        next_page=f"http://127.0.0.1:8000/verification/{user.pk}",
+        message="SMS с токеном отправлено на указанный номер телефона",
+    )
+
+
+def profile_data(user: User) -> ProfileData:
+    """
+    Функция формирует профиль пользователя без создания экземпляров сериализаторов.
+    Номера телефонов приглашенных пользователей выбираются одним запросом через values_list(),
+    без создания экземпляров модели User.
+    :param user: экземпляр пользователя, профиль которого запрошен
+    :return: экземпляр ProfileData
+    """
+    referrals = User.objects.filter(referred_by=user).values_list('phone_number', flat=True)
+    return ProfileData(
+        id=user.pk,
+        phone_number=str(user.phone_number),
+        referral_code=user.referral_code,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        email=user.email,
+        entered_referral_code=[ReferralData(phone_number=str(phone_number)) for phone_number in referrals],
+    )
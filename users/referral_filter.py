@@ -0,0 +1,245 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from django.conf import settings
+
+
+class BloomFilter:
+    """
+    Класс BloomFilter — это фильтр Блума: компактное вероятностное множество строк.
+    Проверка принадлежности не дает ложноотрицательных ответов, а доля ложноположительных
+    определяется размером битового массива и количеством хеш-функций.
+    Позиции битов вычисляются двойным хешированием одного дайджеста BLAKE2b.
+    """
+    HEADER = struct.Struct('<QBQ')  # размер в битах, количество хеш-функций, количество элементов
+
+    def __init__(self, size: int, hash_count: int, bits: Optional[bytearray] = None, count: int = 0):
+        self.size = size
+        self.hash_count = hash_count
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> 'BloomFilter':
+        """
+        Создает пустой фильтр оптимального размера для заданного количества элементов.
+        :param capacity: ожидаемое количество элементов
+        :param error_rate: допустимая доля ложноположительных ответов
+        :return: экземпляр BloomFilter
+        """
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hash_count = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hash_count)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> bool:
+        """
+        Добавляет строку в фильтр.
+        Счетчик элементов увеличивается, только если был установлен хотя бы один новый бит,
+        поэтому повторное добавление той же строки не искажает оценку доли ложноположительных ответов.
+        :return: True, если строка добавлена впервые (с точностью до ложноположительных ответов).
+        """
+        added = False
+        for position in self._positions(item):
+            index, mask = position >> 3, 1 << (position & 7)
+            if not self.bits[index] & mask:
+                self.bits[index] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Размер битового массива в байтах.
+        """
+        return len(self.bits)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """
+        Оценка доли ложноположительных ответов при текущем заполнении фильтра.
+        """
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+    def to_bytes(self) -> bytes:
+        return self.HEADER.pack(self.size, self.hash_count, self.count) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BloomFilter':
+        size, hash_count, count = cls.HEADER.unpack_from(data)
+        return cls(size, hash_count, bytearray(data[cls.HEADER.size:]), count)
+
+
+class ReferralCodeFilter:
+    """
+    Класс ReferralCodeFilter хранит в памяти процесса фильтр Блума всех выданных промо-кодов.
+    Он позволяет отклонить несуществующий промо-код без запроса к базе данных.
+
+    Фильтр загружается из снимка, который создает команда build_referral_filter.
+    Вместе со снимком хранится водяной знак — максимальный id просмотренного пользователя —
+    и id пользователей до водяного знака, у которых еще не было промо-кода.
+    Коды, выданные в этом процессе, добавляются функцией generate_referral_code.
+    Коды, выданные другими процессами, догружаются по id больше водяного знака и по отложенным id,
+    если проверяемого кода нет в фильтре (не чаще одного раза в REFRESH_INTERVAL секунд).
+    Поэтому фильтр отстает от базы данных не более чем на REFRESH_INTERVAL: код, выданный другим процессом
+    (или присвоенный пользователю без кода), может быть отклонен, только если его проверяют раньше чем через
+    REFRESH_INTERVAL секунд после выдачи. Любой промах после этого запускает догрузку, даже при непрерывном
+    потоке проверок, поэтому окно всегда закрывается.
+    После массового импорта пользователей без промо-кодов стоит выполнить backfill_referral_codes
+    и перестроить снимок, чтобы список отложенных id не разрастался.
+    Если снимка нет, фильтр отключен и все проверки передаются базе данных.
+    """
+    MAGIC = b'RCBF'
+    SNAPSHOT_HEADER = struct.Struct('<4sQQ')  # сигнатура, водяной знак, количество отложенных id
+    PENDING_BATCH_SIZE = 10000  # отложенных id в одном запросе догрузки
+
+    def __init__(self):
+        self.bloom: Optional[BloomFilter] = None
+        self.watermark = 0
+        self.pending = set()  # id пользователей до водяного знака без промо-кода
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def config() -> dict:
+        return settings.REFERRAL_CODE_FILTER
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                path = Path(self.config()['PATH'])
+                if path.exists():
+                    self.load(path.read_bytes())
+                self._loaded = True
+
+    def load(self, data: bytes) -> None:
+        """
+        Загружает фильтр из снимка.
+        :param data: содержимое снимка
+        """
+        magic, watermark, pending_count = self.SNAPSHOT_HEADER.unpack_from(data)
+        if magic != self.MAGIC:
+            raise ValueError('Файл не является снимком фильтра промо-кодов.')
+        offset = self.SNAPSHOT_HEADER.size
+        pending = array('Q')
+        pending.frombytes(data[offset:offset + pending_count * pending.itemsize])
+        self.bloom = BloomFilter.from_bytes(data[offset + pending_count * pending.itemsize:])
+        self.watermark = watermark
+        self.pending = set(pending)
+
+    def dump(self) -> bytes:
+        """
+        Возвращает снимок фильтра вместе с водяным знаком и отложенными id.
+        """
+        pending = array('Q', sorted(self.pending))
+        return (self.SNAPSHOT_HEADER.pack(self.MAGIC, self.watermark, len(pending)) + pending.tobytes()
+                + self.bloom.to_bytes())
+
+    def save(self, path: Path) -> None:
+        """
+        Атомарно записывает снимок фильтра в файл.
+        :param path: путь к файлу снимка
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        tmp_path.write_bytes(self.dump())
+        os.replace(tmp_path, path)
+
+    def _consume(self, rows: Iterable[Tuple[int, Optional[str]]]) -> None:
+        """
+        Добавляет в фильтр промо-коды из пар (id пользователя, промо-код).
+        Водяной знак продвигается и за пользователей без промо-кода, а их id откладываются:
+        код им может быть присвоен позже, и его нужно будет догрузить.
+        """
+        for pk, code in rows:
+            if code is None:
+                self.pending.add(pk)
+            else:
+                self.bloom.add(code)
+                self.pending.discard(pk)
+            self.watermark = max(self.watermark, pk)
+
+    def rebuild(self) -> None:
+        """
+        Строит фильтр заново по всем промо-кодам из базы данных.
+        """
+        from users.models import User
+
+        config = self.config()
+        with self._lock:
+            self.bloom = BloomFilter.for_capacity(config['CAPACITY'], config['ERROR_RATE'])
+            self.watermark = 0
+            self.pending = set()
+            self._consume(User.objects.order_by('pk').values_list('pk', 'referral_code').iterator(chunk_size=10000))
+            self._loaded = True
+
+    def catch_up(self) -> bool:
+        """
+        Догружает промо-коды пользователей с id больше водяного знака и отложенных пользователей,
+        которым код был присвоен позже. Удаленные пользователи исключаются из отложенных.
+        Выполняется не чаще одного раза в REFRESH_INTERVAL секунд, чтобы поток случайных кодов
+        не превращался в поток запросов к базе данных.
+        :return: True, если догрузка выполнена, False, если она пропущена из-за ограничения частоты.
+        """
+        from users.models import User
+
+        if time.monotonic() - self._last_refresh < self.config()['REFRESH_INTERVAL']:
+            return False
+        with self._lock:
+            self._last_refresh = time.monotonic()
+            self._consume(User.objects.filter(pk__gt=self.watermark).order_by('pk')
+                          .values_list('pk', 'referral_code').iterator(chunk_size=10000))
+            pending = sorted(self.pending)
+            for start in range(0, len(pending), self.PENDING_BATCH_SIZE):
+                chunk = pending[start:start + self.PENDING_BATCH_SIZE]
+                # Пользователи, которые все еще без кода, вернутся в отложенные при разборе строк.
+                self.pending.difference_update(chunk)
+                self._consume(User.objects.filter(pk__in=chunk).values_list('pk', 'referral_code'))
+        return True
+
+    def add(self, code: str) -> None:
+        """
+        Добавляет только что выданный промо-код в фильтр, если фильтр загружен.
+        :param code: промо-код
+        """
+        if self.bloom is not None:
+            self.bloom.add(code)
+
+    def might_contain(self, code) -> bool:
+        """
+        Проверяет, мог ли промо-код быть выдан.
+        :param code: промо-код
+        :return: False, если код не выдавался (или выдан менее REFRESH_INTERVAL секунд назад другим процессом);
+                 True, если код нужно проверить в базе данных.
+        """
+        self._ensure_loaded()
+        if self.bloom is None:
+            return True
+        code = str(code)
+        if code in self.bloom:
+            return True
+        self.catch_up()
+        return code in self.bloom
+
+
+referral_code_filter = ReferralCodeFilter()
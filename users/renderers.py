@@ -0,0 +1,52 @@
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+from rest_framework.utils.mediatypes import _MediaType
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Класс ORJSONRenderer — это рендерер JSON, который использует C-расширение orjson вместо модуля json.
+    Он сериализует словари, списки и dataclass-объекты без промежуточных преобразований,
+    а типы, которые orjson не поддерживает (ленивые строки, Decimal и т.п.), передает стандартному кодировщику DRF.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    # Разрешаем нестроковые ключи словарей так же, как это делает стандартный модуль json.
+    options = orjson.OPT_NON_STR_KEYS
+    encoder = encoders.JSONEncoder()
+
+    def get_indent(self, accepted_media_type, renderer_context) -> bool:
+        """
+        Определяет, нужно ли форматировать ответ с отступами.
+        Отступы запрашиваются параметром indent в заголовке Accept или в контексте рендерера (Browsable API).
+        orjson поддерживает только отступ в 2 пробела, поэтому любое положительное значение indent
+        дает отступ в 2 пробела, а нулевое или некорректное значение — компактный JSON.
+        :return: True, если ответ нужно форматировать с отступами, иначе False.
+        """
+        indent = None
+        if accepted_media_type:
+            indent = _MediaType(accepted_media_type).params.get('indent')
+        if indent is None:
+            indent = (renderer_context or {}).get('indent')
+        try:
+            return int(indent or 0) > 0
+        except (TypeError, ValueError):
+            return False
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        """
+        Преобразует данные ответа в JSON.
+        :param data: данные ответа
+        :param accepted_media_type: согласованный тип содержимого
+        :param renderer_context: контекст рендерера
+        :return: JSON в виде байтовой строки в кодировке UTF-8.
+        """
+        if data is None:
+            return b''
+
+        option = self.options
+        if self.get_indent(accepted_media_type, renderer_context):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self.encoder.default, option=option)
@@ -0,0 +1,131 @@
+from decimal import Decimal
+from itertools import islice
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from users.models import User, ReferralReward
+
+
+def load_referral_graph(batch_size: int = 100_000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Функция загружает граф приглашений из базы данных в компактные массивы NumPy.
+    Пользователи нумеруются плотными индексами в порядке возрастания id.
+    :param batch_size: количество строк, которое переносится в массивы за один шаг
+    :return: кортеж (ids — id пользователей, parents — индекс пригласившего пользователя или -1,
+             verified — флаг верификации пользователя)
+    """
+    max_pk = User.objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+    queryset = User.objects.filter(pk__lte=max_pk).order_by('pk')
+    total = queryset.count()
+
+    ids = np.empty(total, dtype=np.int64)
+    parent_ids = np.empty(total, dtype=np.int64)
+    verified = np.empty(total, dtype=bool)
+
+    filled = 0
+    rows = queryset.values_list('pk', 'referred_by_id', 'is_verified').iterator(chunk_size=batch_size)
+    while filled < total:
+        batch = list(islice(rows, min(batch_size, total - filled)))
+        if not batch:
+            break  # пользователи удалены во время загрузки
+        pks, referrers, flags = zip(*batch)
+        end = filled + len(batch)
+        ids[filled:end] = pks
+        parent_ids[filled:end] = [referrer or 0 for referrer in referrers]
+        verified[filled:end] = flags
+        filled = end
+
+    ids, parent_ids, verified = ids[:filled], parent_ids[:filled], verified[:filled]
+
+    # Переводим id пригласивших пользователей в плотные индексы.
+    index_dtype = np.int32 if filled < np.iinfo(np.int32).max else np.int64
+    positions = np.minimum(np.searchsorted(ids, parent_ids), max(filled - 1, 0))
+    known = (parent_ids > 0) & (ids[positions] == parent_ids)
+    parents = np.where(known, positions, -1).astype(index_dtype)
+    return ids, parents, verified
+
+
+def compute_rewards(parents: np.ndarray, base: np.ndarray, levels: Sequence[float],
+                    chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    Функция рассчитывает вознаграждения по цепочкам приглашений.
+    Для каждого пользователя сумма base распределяется вверх по цепочке: пригласившему начисляется levels[0],
+    пригласившему его — levels[1] и так далее. Каждый уровень обрабатывается одним векторным проходом.
+    :param parents: индекс пригласившего пользователя или -1
+    :param base: базовая сумма, от которой начисляется вознаграждение за каждого пользователя
+    :param levels: доли вознаграждения по уровням, например (0.10, 0.05, 0.02)
+    :param chunk_size: если задан, пользователи обрабатываются частями такого размера,
+                       а временные массивы не превышают размер части. Массивы parents, base и результирующий
+                       массив rewards по-прежнему целиком находятся в памяти.
+    :return: массив вознаграждений по индексам пользователей
+    """
+    total = len(parents)
+    rewards = np.zeros(total, dtype=np.float64)
+    step = chunk_size or total or 1
+
+    for start in range(0, total, step):
+        ancestors = parents[start:start + step]
+        amounts = base[start:start + step]
+        for weight in levels:
+            # Оставляем только пользователей, у которых цепочка продолжается на этом уровне.
+            active = ancestors >= 0
+            ancestors, amounts = ancestors[active], amounts[active]
+            if not len(ancestors):
+                break
+            if chunk_size:
+                np.add.at(rewards, ancestors, amounts * weight)
+            else:
+                rewards += np.bincount(ancestors, weights=amounts * weight, minlength=total)
+            ancestors = parents[ancestors]
+
+    return rewards
+
+
+@transaction.atomic
+def save_rewards(ids: np.ndarray, rewards: np.ndarray, batch_size: int = 5000) -> int:
+    """
+    Функция заменяет сохраненные вознаграждения результатами расчета.
+    Записи создаются пакетами через bulk_create, пользователи без вознаграждения не сохраняются.
+    :param ids: id пользователей
+    :param rewards: вознаграждения по индексам пользователей
+    :param batch_size: количество записей в одном INSERT
+    :return: количество сохраненных записей
+    """
+    computed_at = timezone.now()
+    cents = np.rint(rewards * 100).astype(np.int64)
+    earners = np.flatnonzero(cents)
+
+    ReferralReward.objects.all().delete()
+    for start in range(0, len(earners), batch_size):
+        chunk = earners[start:start + batch_size]
+        ReferralReward.objects.bulk_create(
+            [ReferralReward(user_id=int(ids[i]), amount=Decimal(int(cents[i])).scaleb(-2), computed_at=computed_at)
+             for i in chunk],
+            batch_size=batch_size,
+        )
+    return len(earners)
+
+
+def run_reward_calculation(levels: Optional[Sequence[float]] = None, base_amount: Optional[float] = None,
+                           chunk_size: Optional[int] = None) -> int:
+    """
+    Функция выполняет полный расчет: загружает граф приглашений, рассчитывает и сохраняет вознаграждения.
+    Вознаграждение начисляется только за верифицированных пользователей.
+    :param levels: доли вознаграждения по уровням (по умолчанию REFERRAL_REWARD_LEVELS)
+    :param base_amount: базовая сумма за пользователя (по умолчанию REFERRAL_REWARD_BASE_AMOUNT)
+    :param chunk_size: размер части для расчета; ограничивает только временные массивы,
+                       граф приглашений и вознаграждения загружаются в память целиком
+    :return: количество пользователей, получивших вознаграждение
+    """
+    levels = levels or settings.REFERRAL_REWARD_LEVELS
+    base_amount = settings.REFERRAL_REWARD_BASE_AMOUNT if base_amount is None else base_amount
+
+    ids, parents, verified = load_referral_graph()
+    base = verified * float(base_amount)
+    rewards = compute_rewards(parents, base, levels, chunk_size=chunk_size)
+    return save_rewards(ids, rewards)
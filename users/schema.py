@@ -0,0 +1,105 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition, require_safe
+
+# Форматы схемы: расширение файла и тип содержимого ответа (совпадают с рендерерами drf-spectacular).
+SCHEMA_FORMATS = {
+    'yaml': 'application/vnd.oai.openapi; charset=utf-8',
+    'json': 'application/vnd.oai.openapi+json; charset=utf-8',
+}
+
+# Кэш схемы в памяти процесса: формат -> (содержимое, ETag).
+_schema_cache: Dict[str, Tuple[bytes, str]] = {}
+
+
+def schema_version() -> str:
+    """
+    Функция возвращает версию API, под которой сохраняется артефакт схемы.
+    :return: значение VERSION из SPECTACULAR_SETTINGS.
+    """
+    return str(settings.SPECTACULAR_SETTINGS.get('VERSION') or '0.0.0')
+
+
+def schema_artifact_path(fmt: str) -> Path:
+    """
+    Функция возвращает путь к артефакту схемы OpenAPI для текущей версии API.
+    :param fmt: формат схемы ('yaml' или 'json')
+    :return: путь к файлу вида <OPENAPI_SCHEMA_DIR>/openapi-<версия>.<формат>
+    """
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f'openapi-{schema_version()}.{fmt}'
+
+
+def render_schema() -> Dict[str, bytes]:
+    """
+    Функция выполняет полную интроспекцию API средствами drf-spectacular
+    и возвращает схему во всех поддерживаемых форматах.
+    drf-spectacular импортируется только здесь, чтобы не загружать его при старте воркера.
+    :return: словарь формат -> содержимое схемы.
+    """
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    import users.openapi  # noqa: F401 регистрирует расширения схемы
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        'yaml': OpenApiYamlRenderer().render(schema, renderer_context={}),
+        'json': OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+
+
+def load_schema(fmt: str) -> Tuple[bytes, str]:
+    """
+    Функция возвращает схему OpenAPI и ее ETag из кэша в памяти.
+    При первом обращении схема читается из артефакта, созданного командой build_schema,
+    если это разрешено настройкой OPENAPI_SCHEMA_USE_ARTIFACT. Иначе, или если артефакта нет,
+    схема один раз генерируется в процессе и кэшируется.
+    :param fmt: формат схемы ('yaml' или 'json')
+    :return: кортеж (содержимое схемы, ETag)
+    """
+    if fmt not in _schema_cache:
+        path = schema_artifact_path(fmt)
+        use_artifact = settings.OPENAPI_SCHEMA_USE_ARTIFACT and path.exists()
+        rendered = {fmt: path.read_bytes()} if use_artifact else render_schema()
+        for key, content in rendered.items():
+            _schema_cache[key] = (content, f'"{hashlib.sha256(content).hexdigest()}"')
+    return _schema_cache[fmt]
+
+
+def requested_format(request) -> str:
+    """
+    Функция определяет запрошенный формат схемы по параметру format или заголовку Accept.
+    По умолчанию, как и SpectacularAPIView, возвращается YAML.
+    :param request: объект запроса
+    :return: 'yaml' или 'json'
+    """
+    fmt = request.GET.get('format')
+    if fmt in SCHEMA_FORMATS:
+        return fmt
+    accept = request.headers.get('Accept', '')
+    if 'json' in accept and 'yaml' not in accept:
+        return 'json'
+    return 'yaml'
+
+
+@require_safe
+@condition(etag_func=lambda request: load_schema(requested_format(request))[1])
+def schema_view(request) -> HttpResponse:
+    """
+    Представление отдает заранее сгенерированную схему OpenAPI из памяти процесса.
+    Заголовок ETag позволяет клиентам получать ответ 304 без передачи схемы.
+    :param request: объект запроса
+    :return: объект HttpResponse со схемой
+    """
+    fmt = requested_format(request)
+    content, _ = load_schema(fmt)
+    response = HttpResponse(content, content_type=SCHEMA_FORMATS[fmt])
+    # Формат зависит от заголовка Accept, поэтому кэши должны его учитывать.
+    patch_vary_headers(response, ['Accept'])
+    return response
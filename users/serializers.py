@@ -1,9 +1,18 @@
+from datetime import timedelta
 from typing import Dict, Any
 
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from rest_framework import serializers
 from phonenumber_field.serializerfields import PhoneNumberField
 
+from users.codes import hash_auth_code
 from users.models import User, AuthCode
+from users.outbox import enqueue_event, USER_VERIFIED, REFERRAL_ACTIVATED, user_verified_payload, \
+    referral_activated_payload
+from users.referral_filter import referral_code_filter
 from users.service import auth_code_age_validator
 from users.utils import generate_referral_code
 from rest_framework.exceptions import ValidationError
@@ -43,9 +52,9 @@ class LoginSerializer(serializers.ModelSerializer):
             instance.referral_code = generate_referral_code()
             instance.save()
 
-        # Создаем объект кода аутентификации и сохраняем его.
-        code = AuthCode.objects.create(user=instance)
-        code.save()
+        # Создаем код аутентификации. В базе данных сохраняется только его хеш,
+        # поэтому сам код запоминаем для отправки в SMS.
+        self.auth_code = AuthCode.issue(instance)
 
         # Возвращаем объект пользователя.
         return instance
@@ -101,13 +110,27 @@ class VerificationAuthCodeSerializer(serializers.Serializer):
             raise serializers.ValidationError('Не предоставлены данные аутентификации пользователя.')
         try:
             user = User.objects.get(phone_number=phone_number)
-            AuthCode.objects.filter(user=user, code=code, is_active=True).first()
-            attrs['user'] = user
-            user.is_verified = True
-            user.save()
-
+            # Сравниваем хеш кода с хешами активных неистекших кодов пользователя за постоянное время.
+            code_hash = hash_auth_code(code)
+            issued_after = timezone.now() - timedelta(seconds=settings.CODE_EXPIRE_TIME)
+            auth_codes = AuthCode.objects.filter(user=user, is_active=True, created_at__gte=issued_after)
+            matched = [pk for pk, stored_hash in auth_codes.values_list('pk', 'code_hash')
+                       if constant_time_compare(code_hash, stored_hash)]
+            if not matched:
+                raise AuthCode.DoesNotExist
+            # Отключенная учетная запись проверяется до любых изменений в базе данных.
             if not user.is_active:
                 raise serializers.ValidationError('Учетная запись пользователя отключена.')
+            attrs['user'] = user
+            # Флаг верификации меняется условным UPDATE: событие о первой верификации записывается в outbox
+            # в той же транзакции и только тем запросом, который действительно изменил флаг.
+            with transaction.atomic():
+                # Код одноразовый: если параллельный запрос уже использовал его, UPDATE не изменит ни одной строки.
+                if not AuthCode.objects.filter(pk__in=matched, is_active=True).update(is_active=False):
+                    raise AuthCode.DoesNotExist
+                if User.objects.filter(pk=user.pk, is_verified=False).update(is_verified=True):
+                    enqueue_event(USER_VERIFIED, user_verified_payload(user))
+            user.is_verified = True
 
         except AuthCode.DoesNotExist:
             raise serializers.ValidationError('Введен неверный токен')
@@ -197,6 +220,9 @@ class ProfileSerializer(serializers.ModelSerializer):
             # Если пользователь уже связан с другим промо-кодом, вызываем исключение
             if self.instance.referred_by is not None:
                 raise serializers.ValidationError('Вы можете активировать промо-код только один раз.')
+            # Отклоняем промо-код, который точно не выдавался, без запроса к базе данных
+            elif not referral_code_filter.might_contain(referred_by):
+                raise serializers.ValidationError('Введен неверный код.')
             else:
                 # Ищем пользователя с введенным промо-кодом
                 try:
@@ -205,9 +231,12 @@ class ProfileSerializer(serializers.ModelSerializer):
                     # Если пользователь не найден, вызываем исключение
                     raise serializers.ValidationError('Введен неверный код.')
                 else:
-                    # Связываем пользователя с введенным промо-кодом
-                    self.instance.referred_by = user_with_refered
-                    self.instance.save()
+                    # Связываем пользователя с введенным промо-кодом и в той же транзакции
+                    # записываем событие об активации промо-кода в outbox.
+                    with transaction.atomic():
+                        self.instance.referred_by = user_with_refered
+                        self.instance.save()
+                        enqueue_event(REFERRAL_ACTIVATED, referral_activated_payload(self.instance))
 
         return super().is_valid(raise_exception=raise_exception)
     # raise_exception - это параметр метода is_valid(),
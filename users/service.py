@@ -1,6 +1,7 @@
 from django.utils import timezone
 from django.conf import settings
 
+from users.codes import hash_auth_code
 from users.models import AuthCode
 
 
@@ -11,7 +12,10 @@ def auth_code_age_validator(code) -> bool:
     :return:- bool: True, если токен активен и не истек, иначе False
     """
     try:
-        auth_code = AuthCode.objects.filter(code=code, is_active=True).first()
+        # Код ищется по ключевому хешу: сами коды в базе данных не хранятся.
+        auth_code = AuthCode.objects.filter(code_hash=hash_auth_code(code), is_active=True).first()
+        if auth_code is None:
+            raise AuthCode.DoesNotExist
         seconds = (timezone.now() - auth_code.created_at).total_seconds()
         if seconds <= settings.CODE_EXPIRE_TIME:  # срок жизни кода подверждения 10 минут
             return True
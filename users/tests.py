@@ -1,3 +1,504 @@
-from django.test import TestCase
+import json
+import subprocess
+import tempfile
+import threading
+from collections import Counter
+from dataclasses import asdict
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.codes import referral_codes, auth_codes, REFERRAL_CODE_ALPHABET, AUTH_CODE_ALPHABET
+from users.models import User, AuthCode, WebhookEndpoint, OutboxEvent, ReferralReward
+from users.middleware import SamplingProfilerMiddleware
+from users.outbox import WebhookDeliveryWorker, enqueue_event, USER_VERIFIED, REFERRAL_ACTIVATED
+from users.profiling import read_profiles, write_profile
+from users.projections import TokenData, login_response, profile_data
+from users.referral_filter import ReferralCodeFilter
+from users.renderers import ORJSONRenderer
+from users import schema
+from users.rewards import compute_rewards, load_referral_graph, run_reward_calculation, save_rewards
+from users.serializers import VerificationAuthCodeSerializer, ProfileSerializer, LoginSerializer, \
+    TokenResponseSerializer
+
+
+class StubReceiver:
+    """
+    Локальный HTTP-сервер, который принимает уведомления и отвечает заданным кодом статуса.
+    """
+
+    def __init__(self, status=200):
+        self.status = status
+        self.requests = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                receiver.requests.append((dict(self.headers), json.loads(body)))
+                self.send_response(receiver.status)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/hook'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class OutboxTestCase(TestCase):
+
+    def setUp(self):
+        self.receiver = StubReceiver()
+        self.addCleanup(self.receiver.close)
+        self.endpoint = WebhookEndpoint.objects.create(url=self.receiver.url, secret='secret')
+        self.user = User.objects.create(phone_number='+79161234567', referral_code='AAAAAA')
+
+    def verify(self):
+        code = AuthCode.issue(self.user)
+        serializer = VerificationAuthCodeSerializer(data={'phone_number': '+79161234567', 'code': code})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_verification_enqueues_event_once(self):
+        self.verify()
+        self.verify()
+        events = OutboxEvent.objects.filter(event_type=USER_VERIFIED)
+        self.assertEqual(events.count(), 1)
+        self.assertEqual(events.get().payload['user_id'], self.user.pk)
+
+    def test_inactive_user_is_not_verified_and_no_event_is_enqueued(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        code = AuthCode.issue(self.user)
+        serializer = VerificationAuthCodeSerializer(data={'phone_number': '+79161234567', 'code': code})
+        self.assertFalse(serializer.is_valid())
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_verified)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_referral_activation_enqueues_event(self):
+        referred = User.objects.create(phone_number='+79161234568')
+        serializer = ProfileSerializer(referred, data={'unentered_referral_code': 'AAAAAA'}, partial=True)
+        serializer.is_valid()
+        event = OutboxEvent.objects.get(event_type=REFERRAL_ACTIVATED)
+        self.assertEqual(event.payload['referrer_id'], self.user.pk)
+
+    def test_events_are_delivered_in_batches(self):
+        for _ in range(5):
+            enqueue_event(USER_VERIFIED, {'user_id': self.user.pk})
+        worker = WebhookDeliveryWorker(batch_size=3)
+
+        self.assertEqual(worker.deliver_once(), 3)
+        self.assertEqual(worker.deliver_once(), 2)
+        self.assertEqual(worker.deliver_once(), 0)
+
+        self.assertEqual([len(body['events']) for _, body in self.receiver.requests], [3, 2])
+        self.assertIn('X-Webhook-Signature', self.receiver.requests[0][0])
+        self.assertFalse(OutboxEvent.objects.exclude(status=OutboxEvent.STATUS_DELIVERED).exists())
+
+    def test_failed_delivery_is_retried_and_dead_lettered(self):
+        self.receiver.status = 500
+        self.verify()
+        worker = WebhookDeliveryWorker(max_attempts=2)
+
+        worker.deliver_once()
+        event = OutboxEvent.objects.get()
+        self.assertEqual((event.status, event.attempts, event.last_error), (OutboxEvent.STATUS_PENDING, 1, 'HTTP 500'))
+        self.assertGreater(event.next_attempt_at, timezone.now())
+
+        # Событие не отправляется повторно до истечения задержки.
+        self.assertEqual(worker.deliver_once(), 0)
+
+        OutboxEvent.objects.update(next_attempt_at=timezone.now())
+        worker.deliver_once()
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), (OutboxEvent.STATUS_DEAD, 2))
+
+    def test_backlog_of_one_endpoint_does_not_delay_another(self):
+        busy = WebhookEndpoint.objects.create(url=f'{self.receiver.url}/busy')
+        OutboxEvent.objects.bulk_create(OutboxEvent(endpoint=busy, event_type=USER_VERIFIED, payload={})
+                                        for _ in range(30))
+        enqueue_event(USER_VERIFIED, {'user_id': self.user.pk})
+        worker = WebhookDeliveryWorker(batch_size=10, concurrency=2)
+
+        batches = {endpoint.pk: len(events) for endpoint, events in worker.claim()}
+        self.assertEqual(batches, {busy.pk: 10, self.endpoint.pk: 1})
+
+    def test_worker_is_limited_to_given_endpoints(self):
+        other = WebhookEndpoint.objects.create(url=f'{self.receiver.url}/other')
+        enqueue_event(USER_VERIFIED, {'user_id': self.user.pk})
+        worker = WebhookDeliveryWorker(endpoint_ids=[other.pk])
+
+        self.assertEqual([endpoint.pk for endpoint, _ in worker.claim()], [other.pk])
+
+    def test_claim_is_limited_to_concurrency_batches(self):
+        for index in range(3):
+            endpoint = WebhookEndpoint.objects.create(url=f'{self.receiver.url}/{index}')
+            OutboxEvent.objects.create(endpoint=endpoint, event_type=USER_VERIFIED, payload={})
+        worker = WebhookDeliveryWorker(concurrency=2)
+
+        self.assertEqual(len(worker.claim()), 2)
+        self.assertEqual(len(worker.claim()), 1)
+
+    def test_unexpected_send_error_is_recorded_as_failed_attempt(self):
+        broken = WebhookEndpoint.objects.create(url='http://127.0.0.1:port/hook')
+        enqueue_event(USER_VERIFIED, {'user_id': self.user.pk})
+
+        self.assertEqual(WebhookDeliveryWorker().deliver_once(), 2)
+        failed = OutboxEvent.objects.get(endpoint=broken)
+        self.assertEqual((failed.status, failed.attempts), (OutboxEvent.STATUS_PENDING, 1))
+        self.assertIn('InvalidURL', failed.last_error)
+        self.assertEqual(OutboxEvent.objects.filter(status=OutboxEvent.STATUS_DELIVERED).count(), 1)
+
+
+class CodesTestCase(TestCase):
+
+    def test_codes_use_alphabet_and_length(self):
+        for generator, alphabet, length in ((referral_codes, REFERRAL_CODE_ALPHABET, 6),
+                                            (auth_codes, AUTH_CODE_ALPHABET, 4)):
+            codes = generator.generate_many(1000) + [generator.generate()]
+            self.assertEqual(len(codes), 1001)
+            for code in codes:
+                self.assertEqual(len(code), length)
+                self.assertTrue(set(code) <= set(alphabet))
+
+    def test_auth_code_is_stored_hashed_and_bound_to_user(self):
+        owner = User.objects.create(phone_number='+79161234567')
+        other = User.objects.create(phone_number='+79161234568')
+        code = AuthCode.issue(owner)
+        self.assertNotEqual(AuthCode.objects.get().code_hash, code)
+
+        serializer = VerificationAuthCodeSerializer(data={'phone_number': '+79161234568', 'code': code})
+        self.assertFalse(serializer.is_valid())
+        serializer = VerificationAuthCodeSerializer(data={'phone_number': '+79161234567', 'code': code})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['user'], owner)
+
+    def test_auth_code_is_single_use(self):
+        User.objects.create(phone_number='+79161234567')
+        code = AuthCode.issue(User.objects.get())
+        data = {'phone_number': '+79161234567', 'code': code}
+        self.assertTrue(VerificationAuthCodeSerializer(data=data).is_valid())
+        self.assertFalse(AuthCode.objects.get().is_active)
+        self.assertFalse(VerificationAuthCodeSerializer(data=data).is_valid())
+
+    def test_expired_auth_code_is_rejected(self):
+        user = User.objects.create(phone_number='+79161234567')
+        code = AuthCode.issue(user)
+        AuthCode.objects.update(created_at=timezone.now() - timedelta(seconds=settings.CODE_EXPIRE_TIME + 1))
+        serializer = VerificationAuthCodeSerializer(data={'phone_number': '+79161234567', 'code': code})
+        self.assertFalse(serializer.is_valid())
+        user.refresh_from_db()
+        self.assertFalse(user.is_verified)
+
+
+@override_settings(REFERRAL_CODE_FILTER={'CAPACITY': 1000, 'ERROR_RATE': 0.01, 'PATH': '', 'REFRESH_INTERVAL': 0})
+class ReferralCodeFilterTestCase(TestCase):
+
+    def setUp(self):
+        for index in range(20):
+            User.objects.create(phone_number=f'+791612345{index:02}', referral_code=f'CODE{index:02}')
+        self.code_filter = ReferralCodeFilter()
+        self.code_filter.rebuild()
+
+    def test_rebuild_has_no_false_negatives(self):
+        for index in range(20):
+            self.assertTrue(self.code_filter.might_contain(f'CODE{index:02}'))
+        self.assertEqual(self.code_filter.bloom.count, 20)
+        self.assertEqual(self.code_filter.watermark, User.objects.latest('pk').pk)
+
+    def test_dump_load_round_trip(self):
+        User.objects.create(phone_number='+79161234599')
+        self.code_filter.catch_up()
+
+        loaded = ReferralCodeFilter()
+        loaded.load(self.code_filter.dump())
+        self.assertEqual(loaded.bloom.bits, self.code_filter.bloom.bits)
+        self.assertEqual((loaded.bloom.size, loaded.bloom.hash_count, loaded.bloom.count),
+                         (self.code_filter.bloom.size, self.code_filter.bloom.hash_count, self.code_filter.bloom.count))
+        self.assertEqual((loaded.watermark, loaded.pending), (self.code_filter.watermark, self.code_filter.pending))
+        self.assertEqual(len(loaded.pending), 1)
+
+    def test_code_issued_after_snapshot_is_caught_up(self):
+        User.objects.create(phone_number='+79161234599', referral_code='LATE01')
+        self.assertTrue(self.code_filter.might_contain('LATE01'))
+        self.assertEqual(self.code_filter.watermark, User.objects.latest('pk').pk)
+
+    def test_staleness_is_bounded_by_refresh_interval(self):
+        clock = mock.patch('users.referral_filter.time.monotonic', return_value=1000.0)
+        monotonic = clock.start()
+        self.addCleanup(clock.stop)
+        with override_settings(REFERRAL_CODE_FILTER={**settings.REFERRAL_CODE_FILTER, 'REFRESH_INTERVAL': 1}):
+            self.assertTrue(self.code_filter.catch_up())
+            User.objects.create(phone_number='+79161234599', referral_code='LATE03')
+
+            # Непрерывный поток промахов каждые 0,1 с: пока интервал не истек, код еще не виден,
+            # но первый промах после истечения интервала догружает его.
+            seen_at = None
+            for step in range(1, 20):
+                monotonic.return_value = 1000.0 + step / 10
+                self.assertFalse(self.code_filter.might_contain(f'BOT{step:03}'))
+                if seen_at is None and self.code_filter.might_contain('LATE03'):
+                    seen_at = step / 10
+            self.assertEqual(seen_at, 1.0)
+
+    def test_user_without_code_does_not_hold_watermark(self):
+        pending = User.objects.create(phone_number='+79161234598')
+        for index in range(5):
+            User.objects.create(phone_number=f'+791612346{index:02}', referral_code=f'NEXT{index:02}')
+
+        for _ in range(3):
+            self.code_filter.catch_up()
+        self.assertEqual(self.code_filter.watermark, User.objects.latest('pk').pk)
+        self.assertEqual(self.code_filter.pending, {pending.pk})
+        self.assertEqual(self.code_filter.bloom.count, 25)
+
+        # Код, присвоенный отложенному пользователю позже, тоже догружается.
+        User.objects.filter(pk=pending.pk).update(referral_code='LATE02')
+        self.assertTrue(self.code_filter.might_contain('LATE02'))
+        self.assertEqual(self.code_filter.pending, set())
+        self.assertEqual(self.code_filter.bloom.count, 26)
+
+
+class ProfilingTestCase(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+
+    def test_profile_round_trip(self):
+        stacks = Counter({'users.views:LoginView.post;time:sleep': 3, 'users.views:LoginView.post': 1})
+        write_profile(self.directory, '20260101-000000-000000-POST-login-10ms', stacks, max_files=10)
+        self.assertEqual(Counter(dict(read_profiles(self.directory))), stacks)
+
+    def test_rotation_keeps_newest_profiles(self):
+        for index in range(5):
+            write_profile(self.directory, f'20260101-000000-{index:06d}', Counter({'a': 1}), max_files=3)
+        self.assertEqual(sorted(path.stem for path in self.directory.glob('*.folded')),
+                         [f'20260101-000000-{index:06d}' for index in (2, 3, 4)])
+
+    def test_rotation_tolerates_profiles_deleted_by_another_worker(self):
+        for index in range(3):
+            write_profile(self.directory, f'20260101-000000-{index:06d}', Counter({'a': 1}), max_files=10)
+        # Список каталога получен до того, как другой воркер удалил самый старый профиль.
+        listing = sorted(self.directory.glob('*.folded')) + [self.directory / '20260101-000001-000000.folded']
+        listing[0].unlink()
+        with mock.patch.object(Path, 'glob', return_value=iter(listing)):
+            write_profile(self.directory, '20260101-000001-000000', Counter({'a': 1}), max_files=1)
+        self.assertEqual([path.stem for path in self.directory.glob('*.folded')], ['20260101-000001-000000'])
+
+    def test_failed_profile_write_does_not_fail_request(self):
+        config = {'ENABLED': True, 'SAMPLE_RATE': 1, 'PATHS': ['/login/'], 'HEADER': 'X-Profile-Token',
+                  'TOKEN_MAX_AGE': 60, 'INTERVAL': 0.001, 'DIRECTORY': self.directory, 'MAX_FILES': 10}
+        with override_settings(REQUEST_PROFILER=config):
+            middleware = SamplingProfilerMiddleware(lambda request: HttpResponse(status=201))
+        with mock.patch('users.middleware.write_profile', side_effect=OSError('disk full')), \
+                mock.patch('users.middleware.StackSampler.stop', return_value=Counter({'a': 1})), \
+                self.assertLogs('users.middleware', 'ERROR'):
+            response = middleware(RequestFactory().post('/login/'))
+        self.assertEqual(response.status_code, 201)
+
+    def test_report_counts_self_time_at_full_stack_leaf(self):
+        write_profile(self.directory, '20260101-000000-000000', Counter({
+            'users.views:LoginView.post;time:sleep': 3,
+            'users.views:LoginView.post;users.utils:generate_auth_code': 1,
+        }), max_files=10)
+        out = StringIO()
+        call_command('profile_report', directory=self.directory, prefix=['users.'], stdout=out)
+        own, total = out.getvalue().split('Общее время:')
+
+        self.assertIn('Профилей: 1, сэмплов: 4', own)
+        self.assertIn('   25.0        1  users.utils:generate_auth_code', own)
+        # Время в sleep не приписывается представлению, а сам sleep отфильтрован префиксом.
+        self.assertNotIn('LoginView.post', own)
+        self.assertNotIn('time:sleep', own + total)
+        self.assertIn('  100.0        4  users.views:LoginView.post', total)
+
+
+class RewardsTestCase(TestCase):
+    # Цепочка 0 <- 1 <- 2 <- 3 и пользователь 4, приглашенный пользователем 0.
+    PARENTS = np.array([-1, 0, 1, 2, 0], dtype=np.int32)
+    LEVELS = (0.10, 0.05, 0.02)
+
+    def test_levels_are_applied_at_their_depth(self):
+        rewards = compute_rewards(self.PARENTS, np.full(5, 100.0), self.LEVELS)
+        # Пользователь 0: 10 за 1 и 4, 5 за 2 на втором уровне, 2 за 3 на третьем.
+        np.testing.assert_allclose(rewards, [27, 15, 10, 0, 0])
+
+    def test_chunked_and_unchunked_results_are_equal(self):
+        base = np.array([100.0, 50.0, 20.0, 10.0, 5.0])
+        full = compute_rewards(self.PARENTS, base, self.LEVELS)
+        for chunk_size in (1, 2, 3, 10):
+            np.testing.assert_allclose(compute_rewards(self.PARENTS, base, self.LEVELS, chunk_size=chunk_size), full)
+
+    def create_chain(self):
+        users = []
+        for index in range(4):
+            users.append(User.objects.create(phone_number=f'+791612347{index:02}', is_verified=True,
+                                             referred_by=users[-1] if users else None))
+        return users
+
+    def test_load_referral_graph_maps_missing_parents_to_minus_one(self):
+        users = self.create_chain()
+        # Ссылка на пользователя, которого нет в таблице (например, удаленного во время загрузки).
+        missing = User.objects.filter(pk=users[0].pk)
+        missing.update(referred_by_id=users[-1].pk + 1000)
+        self.addCleanup(missing.update, referred_by_id=None)
+
+        ids, parents, verified = load_referral_graph(batch_size=3)
+        self.assertEqual(list(ids), [user.pk for user in users])
+        self.assertEqual(list(parents), [-1, 0, 1, 2])
+        self.assertTrue(verified.all())
+
+    def test_unverified_users_add_nothing(self):
+        users = self.create_chain()
+        User.objects.filter(pk=users[3].pk).update(is_verified=False)
+
+        run_reward_calculation(levels=self.LEVELS, base_amount=100)
+        rewards = dict(ReferralReward.objects.values_list('user_id', 'amount'))
+        self.assertEqual(rewards, {users[0].pk: 15, users[1].pk: 10})
+
+    def test_save_rewards_replaces_earlier_rows(self):
+        users = self.create_chain()
+        ids = np.array([user.pk for user in users])
+        save_rewards(ids, np.array([1.0, 2.0, 0.0, 0.0]))
+        save_rewards(ids, np.array([0.0, 0.0, 3.5, 0.0]))
+        self.assertEqual(list(ReferralReward.objects.values_list('user_id', 'amount')), [(users[2].pk, 3.5)])
+
+
+class ProjectionsTestCase(TestCase):
+    """
+    Облегченные представления ответов должны совпадать с данными сериализаторов, по которым строится схема OpenAPI.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(phone_number='+79161234567', referral_code='AAAAAA', first_name='Иван',
+                                        email='ivan@example.com')
+        User.objects.create(phone_number='+79161234568', referred_by=self.user)
+        User.objects.create(phone_number='+79161234569', referred_by=self.user)
+
+    def test_profile_matches_serializer(self):
+        expected = ProfileSerializer(self.user).data
+        self.assertNotIn('unentered_referral_code', expected)
+        self.assertEqual(asdict(profile_data(self.user)), expected)
+
+    def test_login_user_matches_serializer(self):
+        self.assertEqual(asdict(login_response(self.user))['user'], LoginSerializer(self.user).data)
+
+    def test_token_matches_serializer(self):
+        token = Token.objects.create(user=self.user)
+        self.assertEqual(asdict(TokenData(token=token.key)), TokenResponseSerializer(token).data)
+
+
+class ORJSONTestCase(TestCase):
+
+    def test_renderer_handles_dataclasses_and_fallback_types(self):
+        renderer = ORJSONRenderer()
+        data = {'token': TokenData(token='abc'), 'amount': Decimal('1.50'), 1: None}
+        self.assertEqual(json.loads(renderer.render(data)), {'token': {'token': 'abc'}, 'amount': 1.5, '1': None})
+        self.assertEqual(renderer.render(None), b'')
+
+    def test_renderer_indent(self):
+        renderer = ORJSONRenderer()
+        self.assertEqual(renderer.render({'a': 1}, 'application/json'), b'{"a":1}')
+        self.assertEqual(renderer.render({'a': 1}, 'application/json; indent=4'), b'{\n  "a": 1\n}')
+        self.assertEqual(renderer.render({'a': 1}, 'application/json; indent=0'), b'{"a":1}')
+        self.assertEqual(renderer.render({'a': 1}, 'application/json; indent=x'), b'{"a":1}')
+
+    def test_parser_accepts_json_and_rejects_malformed_body(self):
+        client = APIClient()
+        user = User.objects.create(phone_number='+79161234567', referral_code='AAAAAA')
+        client.force_authenticate(user)
+
+        response = client.patch('/profile/', '{"first_name": "Иван"}', content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        user.refresh_from_db()
+        self.assertEqual(user.first_name, 'Иван')
+
+        response = client.patch('/profile/', '{"first_name": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+
+class StartupProfileTestCase(TestCase):
+
+    def run_failed_child(self, stderr):
+        result = subprocess.CompletedProcess(args=[], returncode=3, stdout='', stderr=stderr)
+        with mock.patch('users.management.commands.startup_profile.subprocess.run', return_value=result):
+            with self.assertRaises(CommandError) as context:
+                call_command('startup_profile')
+        return str(context.exception)
+
+    def test_failed_child_reports_last_error_line(self):
+        stderr = 'import time: 10 | 10 | os\nImportError: No module named x\nimport time: 5 | 5 | sys\n'
+        self.assertEqual(self.run_failed_child(stderr), 'ImportError: No module named x')
+
+    def test_failed_child_without_stderr_reports_return_code(self):
+        self.assertEqual(self.run_failed_child(''), 'Процесс завершился с кодом 3')
+
+
+class SchemaTestCase(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        schema._schema_cache.clear()
+        self.addCleanup(schema._schema_cache.clear)
+        override = override_settings(OPENAPI_SCHEMA_DIR=self.directory, OPENAPI_SCHEMA_USE_ARTIFACT=True)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write_artifacts(self):
+        (self.directory / 'openapi-1.0.0.yaml').write_bytes(b'openapi: artifact\n')
+        (self.directory / 'openapi-1.0.0.json').write_bytes(b'{"openapi": "artifact"}')
+
+    def test_build_schema_writes_both_artifacts(self):
+        call_command('build_schema', stdout=StringIO())
+        self.assertIn(b'/verification/{id}', (self.directory / 'openapi-1.0.0.yaml').read_bytes())
+        document = json.loads((self.directory / 'openapi-1.0.0.json').read_bytes())
+        self.assertEqual(document['info']['version'], '1.0.0')
+
+    def test_artifact_is_served_in_requested_format(self):
+        self.write_artifacts()
+        response = self.client.get('/api/schema/')
+        self.assertEqual(response.content, b'openapi: artifact\n')
+        self.assertEqual(response['Content-Type'], schema.SCHEMA_FORMATS['yaml'])
+        self.assertIn('Accept', response['Vary'])
+
+        response = self.client.get('/api/schema/', HTTP_ACCEPT='application/vnd.oai.openapi+json')
+        self.assertEqual(response.content, b'{"openapi": "artifact"}')
+        self.assertEqual(self.client.get('/api/schema/?format=json').content, b'{"openapi": "artifact"}')
+
+    def test_etag_allows_not_modified_and_head(self):
+        self.write_artifacts()
+        etag = self.client.get('/api/schema/')['ETag']
+        self.assertEqual(self.client.get('/api/schema/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/schema/?format=json', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.head('/api/schema/').status_code, 200)
+        self.assertEqual(self.client.post('/api/schema/').status_code, 405)
+
+    def test_artifact_is_ignored_unless_enabled(self):
+        self.write_artifacts()
+        with override_settings(OPENAPI_SCHEMA_USE_ARTIFACT=False):
+            response = self.client.get('/api/schema/')
+        self.assertNotEqual(response.content, b'openapi: artifact\n')
+        self.assertIn(b'/verification/{id}', response.content)
@@ -1,15 +1,30 @@
-import random
-import string
-
 from rest_framework.authtoken.models import Token
 
+from users.codes import referral_codes, auth_codes
+from users.referral_filter import referral_code_filter
+
 
 def generate_referral_code():
     """
     Метод генерирует промо код, состоящий из 6 символов, включая заглавные буквы и цифры.
     :return: Строка, содержащая 6 символов, включая заглавные буквы и цифры.
     """
-    return ''.join([random.choice(list(string.ascii_uppercase + string.digits)) for x in range(6)])
+    code = referral_codes.generate()
+    # Новый код сразу попадает в фильтр выданных промо-кодов этого процесса.
+    referral_code_filter.add(code)
+    return code
+
+
+def generate_referral_codes(count: int) -> list:
+    """
+    Метод генерирует пакет промо-кодов для импорта и заполнения данных.
+    :param count: количество промо-кодов
+    :return: Список строк из 6 символов, включая заглавные буквы и цифры (уникальность не гарантируется).
+    """
+    codes = referral_codes.generate_many(count)
+    for code in codes:
+        referral_code_filter.add(code)
+    return codes
 
 
 def generate_auth_code():
@@ -17,7 +32,7 @@ def generate_auth_code():
     Метод генерирует код активации из 4 цифр.
     :return: Строка, содержащая 4 цифры.
     """
-    return ''.join([random.choice(list('123456789')) for x in range(4)])
+    return auth_codes.generate()
 
 
 def sms_with_auth_code(user, auth_code, **kwargs) -> None:
@@ -6,9 +6,9 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from time import sleep
 
-from users.models import User, AuthCode
-from users.serializers import LoginSerializer, VerificationAuthCodeSerializer, TokenResponseSerializer, \
-    ProfileSerializer
+from users.models import User
+from users.projections import TokenData, login_response, profile_data
+from users.serializers import LoginSerializer, VerificationAuthCodeSerializer, ProfileSerializer
 from users.utils import sms_with_auth_code, create_auth_token
 
 
@@ -36,20 +36,13 @@ class LoginView(CreateAPIView):
         """
         serializer = self.get_serializer(data=request.data)  # создаем экземпляр сериализатора
         serializer.is_valid(raise_exception=True)  # проверяем, что данные валидны
-        serializer.save()  # сохраняем данные
+        user = serializer.save()  # сохраняем данные и получаем пользователя без повторного запроса к БД
 
-        if serializer.is_valid:
-            user = User.objects.get(pk=serializer.data['id'])  # получаем пользователя по id
-            confirmation_token = AuthCode.objects.filter(
-                user=user).first()  # получаем токен для обратного вызова
-            sleep(2)  # имитация задержки на сервере
-            sms_with_auth_code(user, confirmation_token, **kwargs)  # отправляем SMS с токеном
+        sleep(2)  # имитация задержки на сервере
+        sms_with_auth_code(user, serializer.auth_code, **kwargs)  # отправляем SMS с кодом, созданным сериализатором
 
-        data = {
-            "user": serializer.data,
-            "next_page": f"http://127.0.0.1:8000/verification/{serializer.data['id']}",
-            "message": "SMS с токеном отправлено на указанный номер телефона",
-        }
+        # Формируем ответ без повторной сериализации пользователя через LoginSerializer.
+        data = login_response(user)
 
         return Response(data, status=status.HTTP_201_CREATED)
 
@@ -82,11 +75,9 @@ class VerificationTokenView(APIView):
             auth_token = create_auth_token(user)
 
             if auth_token:
-                # Создаем экземпляр сериализатора для токена авторизации и передаем ему данные
-                token_serializer = TokenResponseSerializer(data={"token": auth_token.key, }, partial=True)
-                if token_serializer.is_valid():
-                    # Возвращаем наш ключ для использования.
-                    return Response(token_serializer.data, status=status.HTTP_200_OK)
+                # Возвращаем наш ключ для использования. TokenResponseSerializer описывает ответ в схеме OpenAPI
+                # (см. users.openapi).
+                return Response(TokenData(token=auth_token.key), status=status.HTTP_200_OK)
             else:
                 return Response({'detail': 'Не удалось войти. Попробуйте позже.'},
                                 status=status.HTTP_400_BAD_REQUEST)
@@ -112,3 +103,15 @@ class ProfileView(RetrieveUpdateAPIView):
         :return: экземпляр авторизованного пользователя, сделавшего запрос.
         """
         return self.request.user
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        """
+        Функция переопределяет метод родительского класса. Возвращает профиль текущего пользователя,
+        сформированный без создания экземпляров ProfileSerializer и ProfileForeignSerializer.
+        Схема ответа в OpenAPI по-прежнему строится по ProfileSerializer.
+        :param request: объект запроса
+        :param args: дополнительные аргументы
+        :param kwargs: дополнительные именованные аргументы
+        :return: объект Response
+        """
+        return Response(profile_data(self.get_object()))